@@ -1 +1,4 @@
 from .aql import asyncQuantumLauncher, AQLManager
+from .batch import BatchRunner
+from .sink import ResultSink, JsonlSink, PickleSink, ParquetSink, open_sink
+from .checkpoint import CheckpointManifest
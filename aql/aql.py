@@ -1,6 +1,9 @@
 from typing import Tuple
 import asyncio
+import time
 from templates import QuantumLauncher, Backend, Algorithm, Problem
+from .checkpoint import CheckpointManifest
+from .sink import ResultSink
 from typing import List
 import random
 
@@ -47,7 +50,9 @@ class asyncQuantumLauncher(QuantumLauncher):
 
 class AQL:
     def __init__(self, backends: List[Tuple[Backend, int]], algorithms: List[Tuple[Algorithm, int]], problems: List[Tuple[Problem, int]],
-                 debugging: bool = False):
+                 debugging: bool = False, lazy_outputs: bool = False, warm_up: List[str] | bool | None = None,
+                 sink: ResultSink | None = None, keep_results: bool = True,
+                 checkpoint: CheckpointManifest | None = None):
         self.backends = backends
         self.algorithms = algorithms
         self.problems = problems
@@ -56,6 +61,12 @@ class AQL:
         self._async_running = 0
         self.debugging: bool = False
         self.ROUTINE_CLASS = None
+        self.lazy_outputs = lazy_outputs
+        self.warm_up = warm_up
+        self.sink = sink
+        self.keep_results = keep_results
+        self.checkpoint = checkpoint
+        self.skipped = 0
 
     def start(self) -> List[any]:
         self._async_running = 1
@@ -66,7 +77,10 @@ class AQL:
             self._find_default_problem_class(problem)
             problem.__class__ = self._find_default_problem_class(problem)
             # print('binding', problem.__class__)
-            problem.prepare_methods()
+            if self.warm_up:
+                problem.warm_up(None if self.warm_up is True else self.warm_up)
+            elif not self.lazy_outputs:
+                problem.prepare_methods()
 
         asyncio.run(self.run_async())
         return self._results, self._results_bitstring
@@ -75,15 +89,26 @@ class AQL:
         for subclass in problem.__class__.__subclasses__():
             if self.ROUTINE_CLASS in subclass.__bases__:
                 return subclass
+        return problem.__class__
 
-    async def run_async_task(self, pool: asyncio.BaseEventLoop, backend: Backend, algorithm: Algorithm, problem: Problem):
+    async def run_async_task(self, pool: asyncio.BaseEventLoop, backend: Backend, algorithm: Algorithm, problem: Problem,
+                             index: int = 0, key: str | None = None):
         # print('Task Started')
         if self.debugging:
             print('cloud task started')
 
+        start = time.perf_counter()
         result = await pool.run_in_executor(None, algorithm.run, problem, backend)
-        self._results.append(result)
-        self._results_bitstring.append(algorithm.get_bitstring(result))
+        bitstring = algorithm.get_bitstring(result)
+        if self.keep_results:
+            self._results.append(result)
+        self._results_bitstring.append(bitstring)
+        if self.sink is not None:
+            self.sink.write({'index': index, 'backend': backend.path, 'algorithm': algorithm.path,
+                             'problem': problem.path, 'result': result, 'bitstring': bitstring,
+                             'time': time.perf_counter() - start})
+        if self.checkpoint is not None and key is not None:
+            self.checkpoint.mark_done(key, index=index)
         # print('Task Done')
 
         if self.debugging:
@@ -95,13 +120,25 @@ class AQL:
             print('creating tasks started')
         pool = asyncio.get_event_loop()
         tasks = []
+        index = 0
+        repetitions = {}
+        self.skipped = 0
         for backend, b_times in self.backends:
             for algorithm, a_times in self.algorithms:
                 for problem, p_times in self.problems:
                     times = b_times * a_times * p_times
                     for _ in range(times):
-                        tasks.append(self.run_async_task(
-                            pool, backend, algorithm, problem))
+                        key = None
+                        if self.checkpoint is not None:
+                            paths = (problem.path, algorithm.path, backend.path)
+                            repetitions[paths] = repetitions.get(paths, -1) + 1
+                            key = CheckpointManifest.task_key(*paths, repetitions[paths])
+                        if key is not None and key in self.checkpoint:
+                            self.skipped += 1
+                        else:
+                            tasks.append(self.run_async_task(
+                                pool, backend, algorithm, problem, index, key))
+                        index += 1
         # print(len(tasks), tasks)
         await asyncio.gather(*tasks)
         if self.debugging:
@@ -129,11 +166,37 @@ class AQLManager:
         result = aql.result
     print(result)
     ```
+
+    #### Streaming results to disk:
+    Each task's record (paths of backend, algorithm and problem, result, bitstring and time) is written
+    to the sink as soon as the task completes. With `keep_results=False` results are not held in memory.
+    ```
+    sink = open_sink('results/sweep.jsonl', format='jsonl')
+    with AQLManager('my_path', sink=sink, keep_results=False) as launcher:
+        launcher.add()
+    for record in sink.read():
+        print(record['bitstring'])
+    ```
+
+    #### Resuming interrupted sweeps:
+    Tasks listed in the checkpoint manifest as completed are skipped, so rerunning the same sweep
+    runs only the missing ones. Results of skipped tasks are not returned, they should be read from the sink.
+    ```
+    with AQLManager('my_path', sink=open_sink('results/sweep.jsonl'), checkpoint='results/sweep.manifest') as launcher:
+        launcher.add()
+    ```
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, lazy_outputs: bool = False, warm_up: List[str] | bool | None = None,
+                 sink: ResultSink | None = None, keep_results: bool = True,
+                 checkpoint: CheckpointManifest | str | None = None):
         self.aql: asyncQuantumLauncher | None = None
         self.path = path
+        self.lazy_outputs = lazy_outputs
+        self.warm_up = warm_up
+        self.sink = sink
+        self.keep_results = keep_results
+        self.checkpoint = CheckpointManifest(checkpoint) if isinstance(checkpoint, str) else checkpoint
         self.result = []
         self.result_bitstring = []
         self._backends: List[Backend] = []
@@ -161,7 +224,9 @@ class AQLManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_type is not None:
             raise exc_type(exc_val).with_traceback(exc_tb)
-        aql = AQL(self._backends, self._algorithms, self._problems)
+        aql = AQL(self._backends, self._algorithms, self._problems,
+                  lazy_outputs=self.lazy_outputs, warm_up=self.warm_up,
+                  sink=self.sink, keep_results=self.keep_results, checkpoint=self.checkpoint)
         result, result_bitstring = aql.start()
         self.result.extend(result)
         self.result_bitstring.extend(result_bitstring)
@@ -0,0 +1,153 @@
+""" Process pool batch runner for grids of problems, algorithms and backends """
+import itertools
+import os
+import pickle
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterator, List, Tuple
+
+from templates import Algorithm, Backend, Problem, QuantumLauncher
+from .sink import ResultSink
+
+_worker_state: dict = {}
+
+
+def _init_worker(payload: bytes) -> None:
+    """ Unpickles backends, algorithms and problems once per worker process """
+    backends, algorithms, problems = pickle.loads(payload)
+    _worker_state.clear()
+    _worker_state.update(backends=backends, algorithms=algorithms, problems=problems, bound_problems={})
+
+
+def _bound_problem(problem_index: int, backend: Backend) -> Problem:
+    """ Returns worker's copy of the problem for the routine of the backend, so its encodings are reused """
+    key = (problem_index, getattr(backend, 'ROUTINE_CLASS', None))
+    bound_problems = _worker_state['bound_problems']
+    if key not in bound_problems:
+        bound_problems[key] = pickle.loads(pickle.dumps(_worker_state['problems'][problem_index]))
+    return bound_problems[key]
+
+
+def _run_task(task: Tuple[int, int, int, int]) -> dict:
+    index, backend_index, algorithm_index, problem_index = task
+    backend = _worker_state['backends'][backend_index]
+    algorithm = _worker_state['algorithms'][algorithm_index]
+    record = {'index': index, 'backend': backend_index, 'algorithm': algorithm_index, 'problem': problem_index,
+              'pid': os.getpid(), 'result': None, 'bitstring': None, 'error': None}
+    start = time.perf_counter()
+    try:
+        problem = _bound_problem(problem_index, backend)
+        result = QuantumLauncher(problem, algorithm, backend, lazy_outputs=True)._run()
+        record['result'] = result
+        record['bitstring'] = algorithm.get_bitstring(result)
+    except Exception:
+        record['error'] = traceback.format_exc()
+    record['time'] = time.perf_counter() - start
+    return record
+
+
+class BatchRunner:
+    """
+    Runs the Cartesian product of backends, algorithms and problems in a process pool.
+
+    Backends, algorithms and problems are pickled once and unpickled once per worker, tasks are sent as indices.
+    Every worker binds its own copy of a problem to the routine of the backend, so the shared objects are never
+    mutated and encodings are computed at most once per worker and routine. Results are returned in submission
+    order as dicts with task indices, result, bitstring, error traceback (None on success), worker pid and time
+    of the task in seconds. Backends holding connections (e.g. runtime sessions) must be picklable.
+
+    Attributes:
+        max_workers (int | None): Number of worker processes, defaults to the number of CPUs.
+        max_per_backend (int | dict | None): Limit of concurrently running tasks for each backend, either one for all
+            of them or a dict with limits by backend name. None means no limit.
+        mp_context: Multiprocessing context of the pool.
+
+    Example of usage:
+        from aql import BatchRunner
+        from problems import MaxCut
+        from qiskit_routines import QAOA, QiskitBackend
+
+        runner = BatchRunner(max_workers=8, max_per_backend={'ibm_kyoto': 2})
+        records = runner.run([(QiskitBackend('local_simulator'), 1)],
+                             [(QAOA(p=p), 1) for p in range(1, 6)],
+                             [(MaxCut(instance_name='default'), 1)])
+    """
+
+    def __init__(self, max_workers: int | None = None, max_per_backend: int | dict | None = None,
+                 mp_context=None) -> None:
+        self.max_workers = max_workers
+        self.max_per_backend = max_per_backend
+        self.mp_context = mp_context
+
+    def _limit(self, backend: Backend) -> int | None:
+        if isinstance(self.max_per_backend, dict):
+            return self.max_per_backend.get(backend.name)
+        return self.max_per_backend
+
+    @staticmethod
+    def tasks(backends: List[Tuple[Backend, int]], algorithms: List[Tuple[Algorithm, int]],
+              problems: List[Tuple[Problem, int]]) -> List[Tuple[int, int, int, int]]:
+        """ Returns (index, backend, algorithm, problem) tasks in the same order as `AQL` creates them """
+        tasks = []
+        for (b, (_, b_times)), (a, (_, a_times)), (p, (_, p_times)) in itertools.product(
+                enumerate(backends), enumerate(algorithms), enumerate(problems)):
+            for _ in range(b_times * a_times * p_times):
+                tasks.append((len(tasks), b, a, p))
+        return tasks
+
+    def iter_run(self, backends: List[Tuple[Backend, int]], algorithms: List[Tuple[Algorithm, int]],
+                 problems: List[Tuple[Problem, int]], tasks: List[Tuple[int, int, int, int]] | None = None
+                 ) -> Iterator[dict]:
+        """ Yields records of tasks as they complete, see `run` """
+        if tasks is None:
+            tasks = self.tasks(backends, algorithms, problems)
+        if not tasks:
+            return
+        payload = pickle.dumps(([b for b, _ in backends], [a for a, _ in algorithms], [p for p, _ in problems]))
+        limits = [self._limit(backend) for backend, _ in backends]
+        running_by_backend = [0] * len(backends)
+        pending = list(reversed(tasks))
+        running: dict[Future, int] = {}
+        with ProcessPoolExecutor(self.max_workers, mp_context=self.mp_context,
+                                 initializer=_init_worker, initargs=(payload,)) as executor:
+            while pending or running:
+                waiting = []
+                while pending:
+                    task = pending.pop()
+                    backend_index = task[1]
+                    limit = limits[backend_index]
+                    if limit is not None and running_by_backend[backend_index] >= max(limit, 1):
+                        waiting.append(task)
+                        continue
+                    running_by_backend[backend_index] += 1
+                    running[executor.submit(_run_task, task)] = backend_index
+                pending = list(reversed(waiting))
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running_by_backend[running.pop(future)] -= 1
+                    yield future.result()
+
+    def run(self, backends: List[Tuple[Backend, int]], algorithms: List[Tuple[Algorithm, int]],
+            problems: List[Tuple[Problem, int]], sink: ResultSink | None = None,
+            keep_results: bool = True) -> List[dict]:
+        """
+        Runs all tasks and returns their records in submission order.
+
+        Args:
+            backends (List[Tuple[Backend, int]]): Backends with numbers of repetitions.
+            algorithms (List[Tuple[Algorithm, int]]): Algorithms with numbers of repetitions.
+            problems (List[Tuple[Problem, int]]): Problems with numbers of repetitions.
+            sink (ResultSink | None): Sink to which records are written as soon as tasks complete.
+            keep_results (bool): If False, records are only written to the sink and an empty list is returned.
+
+        Returns:
+            List[dict]: Records of the tasks.
+        """
+        records = []
+        for record in self.iter_run(backends, algorithms, problems):
+            if sink is not None:
+                sink.write(record)
+            if keep_results:
+                records.append(record)
+        return sorted(records, key=lambda record: record['index'])
@@ -0,0 +1,58 @@
+""" Checkpoint manifest of completed tasks, used to resume interrupted sweeps """
+import json
+import os
+import threading
+
+from .sink import read_jsonl, truncate_partial_line
+
+
+class CheckpointManifest:
+    """
+    Append-only JSON-lines file with keys of completed tasks.
+
+    A task is identified by paths of its problem, algorithm and backend, and a repetition index counting tasks
+    with the same paths, see `task_key`. Every completed task is written and synced to disk right away,
+    so after an interruption the manifest lists exactly the tasks which don't have to be run again.
+    A partially written last line (e.g. after a crash) is cut off when the manifest is loaded, lines which
+    can't be decoded are ignored.
+
+    Attributes:
+        path (str): Path of the manifest file.
+        completed (set[str]): Keys of completed tasks.
+
+    Example of usage:
+        from aql import AQLManager, CheckpointManifest
+
+        with AQLManager('my_path', checkpoint=CheckpointManifest('results/sweep.manifest')) as launcher:
+            launcher.add(backend, algorithm, problem, times=10)
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.completed: set[str] = set()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            truncate_partial_line(path)
+            self.completed.update(entry['key'] for entry in read_jsonl(path) if 'key' in entry)
+
+    @staticmethod
+    def task_key(problem_path: str, algorithm_path: str, backend_path: str, repetition: int) -> str:
+        return f'{problem_path}|{algorithm_path}|{backend_path}|{repetition}'
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.completed
+
+    def __len__(self) -> int:
+        return len(self.completed)
+
+    def mark_done(self, key: str, **info) -> None:
+        """ Records the task as completed, additional info (e.g. index of the task) is stored along the key """
+        with self._lock:
+            if key in self.completed:
+                return
+            with open(self.path, mode='a', encoding='utf-8') as file:
+                file.write(json.dumps({'key': key, **info}) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+            self.completed.add(key)
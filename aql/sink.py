@@ -0,0 +1,299 @@
+""" Append-only stores for results of tasks, written as soon as the tasks complete """
+import json
+import os
+import pickle
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+
+def truncate_partial_line(path: str, block_size: int = 1 << 16) -> None:
+    """ Cuts a partially written last line (e.g. left by a crash) off a line based file, so appending starts clean """
+    if not os.path.exists(path):
+        return
+    with open(path, mode='rb+') as file:
+        end = file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            file.seek(start)
+            newline = file.read(position - start).rfind(b'\n')
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            file.truncate(position)
+
+
+def read_jsonl(path: str) -> Iterator[dict]:
+    """ Yields decoded lines of a JSON-lines file, skipping lines which aren't complete or valid JSON """
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.endswith('\n'):
+                return
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def to_jsonable(o: object, depth: int = 8):
+    """
+    Returns JSON encodable form of the object.
+
+    Numpy values are converted into python ones, complex numbers are written as repr like in `fix_json`,
+    and result objects (e.g. SamplingVQEResult, OptimizerResult) into dicts of their attributes.
+    Other objects are written as their repr.
+    """
+    if isinstance(o, np.generic):
+        o = o.item()
+    if o is None or isinstance(o, (bool, int, float, str)):
+        return o
+    if isinstance(o, complex):
+        return repr(o)
+    if isinstance(o, np.ndarray):
+        return to_jsonable(o.tolist(), depth)
+    if depth <= 0:
+        return repr(o)
+    if isinstance(o, dict):
+        return {k if isinstance(k, str) else repr(k): to_jsonable(v, depth - 1) for k, v in o.items()}
+    if isinstance(o, (list, tuple, set, frozenset)):
+        return [to_jsonable(v, depth - 1) for v in o]
+    if hasattr(o, 'to_serializable'):
+        return to_jsonable(o.to_serializable(), depth - 1)
+    if o.__class__.__name__.endswith('Result') and hasattr(o, '__dict__'):
+        return {k.lstrip('_'): to_jsonable(v, depth - 1) for k, v in vars(o).items()}
+    return repr(o)
+
+
+class ResultSink(ABC):
+    """
+    Abstract class for append-only stores of task records.
+
+    Records are dicts, e.g. the ones made by `AQL` or `BatchRunner`. Every record is written as soon as it's passed
+    to `write`, so a crash loses at most the record being written, and `read` can be used by another thread or process
+    to analyze the completed records before the whole batch is finished.
+
+    Methods:
+        write(self, record: dict) -> None:
+            Appends the record to the store.
+        read(self, start: int = 0) -> Iterator[dict]:
+            Yields completed records from the store, skipping the first `start` ones.
+        follow(self, poll_interval: float = 1.0) -> Iterator[dict]:
+            Yields records as they are written until the sink is closed.
+        close(self) -> None:
+            Flushes and closes the store.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.closed = False
+        self._written = threading.Condition()
+        self._count = 0
+
+    @abstractmethod
+    def _write(self, record: dict) -> None:
+        """ Appends the record to the store """
+
+    @abstractmethod
+    def _read(self) -> Iterator[dict]:
+        """ Yields all completed records """
+
+    def _flush(self) -> None:
+        """ Writes buffered records """
+
+    def write(self, record: dict) -> None:
+        with self._written:
+            if self.closed:
+                raise ValueError(f'{type(self).__name__} is closed')
+            self._write(record)
+            self._count += 1
+            self._written.notify_all()
+
+    def read(self, start: int = 0) -> Iterator[dict]:
+        for index, record in enumerate(self._read()):
+            if index >= start:
+                yield record
+
+    def follow(self, poll_interval: float = 1.0) -> Iterator[dict]:
+        """ Yields records as they become readable, until the sink is closed and every record has been yielded """
+        yielded = 0
+        while True:
+            closed = self.closed
+            new = 0
+            for record in self.read(yielded):
+                yielded += 1
+                new += 1
+                yield record
+            if closed:
+                return
+            if not new:
+                with self._written:
+                    if not self.closed:
+                        self._written.wait(poll_interval)
+
+    def close(self) -> None:
+        with self._written:
+            if not self.closed:
+                self._flush()
+                self.closed = True
+            self._written.notify_all()
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.read()
+
+    def __enter__(self) -> 'ResultSink':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class JsonlSink(ResultSink):
+    """
+    Writes records as lines of a JSON-lines file, results are converted with `to_jsonable`.
+
+    A partially written last line left by a crash is cut off when the file is opened again, lines which can't be
+    decoded are skipped when reading.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        truncate_partial_line(path)
+        self._file = open(path, mode='a', encoding='utf-8')
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(to_jsonable(record)) + '\n')
+        self._file.flush()
+
+    def _read(self) -> Iterator[dict]:
+        if not os.path.exists(self.path):
+            return
+        yield from read_jsonl(self.path)
+
+    def _flush(self) -> None:
+        self._file.close()
+
+
+class PickleSink(ResultSink):
+    """
+    Writes pickled records into segment files of at most `segment_size` records each.
+
+    Records are stored as they are (e.g. with full SamplingVQEResults), segments are named segment-00000.pkl etc.
+    """
+
+    def __init__(self, path: str, segment_size: int = 100) -> None:
+        super().__init__(path)
+        self.segment_size = segment_size
+        os.makedirs(path, exist_ok=True)
+        self._segment = len(self._segments())
+        self._in_segment = segment_size
+        self._file = None
+
+    def _segments(self) -> list[str]:
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path)
+                      if name.startswith('segment-') and name.endswith('.pkl'))
+
+    def _write(self, record: dict) -> None:
+        if self._in_segment >= self.segment_size:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(os.path.join(self.path, f'segment-{self._segment:05d}.pkl'), mode='ab')
+            self._segment += 1
+            self._in_segment = 0
+        pickle.dump(record, self._file)
+        self._file.flush()
+        self._in_segment += 1
+
+    def _read(self) -> Iterator[dict]:
+        for segment in self._segments():
+            with open(segment, mode='rb') as file:
+                while True:
+                    try:
+                        record = pickle.load(file)
+                    except (EOFError, pickle.UnpicklingError):
+                        break
+                    yield record
+
+    def _flush(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class ParquetSink(ResultSink):
+    """
+    Writes records into Parquet part files of `row_group_size` rows, requires pyarrow or fastparquet.
+
+    Scalar fields are stored in their own columns, other ones (e.g. results) as JSON strings made by `to_jsonable`
+    in columns prefixed with 'json:', which are decoded by `read`. Only flushed parts are visible to readers.
+    """
+    JSON_PREFIX = 'json:'
+
+    def __init__(self, path: str, row_group_size: int = 64) -> None:
+        pd.io.parquet.get_engine('auto')
+        super().__init__(path)
+        self.row_group_size = row_group_size
+        os.makedirs(path, exist_ok=True)
+        self._part = len(self._parts())
+        self._rows = []
+
+    def _parts(self) -> list[str]:
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path)
+                      if name.startswith('part-') and name.endswith('.parquet'))
+
+    def _write(self, record: dict) -> None:
+        row = {}
+        for key, value in to_jsonable(record).items():
+            if isinstance(value, (dict, list)):
+                row[self.JSON_PREFIX + key] = json.dumps(value)
+            else:
+                row[key] = value
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        frame = pd.DataFrame(self._rows)
+        tmp_path = os.path.join(self.path, f'.part-{self._part:05d}.tmp')
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(self.path, f'part-{self._part:05d}.parquet'))
+        self._part += 1
+        self._rows = []
+
+    def _read(self) -> Iterator[dict]:
+        for part in self._parts():
+            for row in pd.read_parquet(part).to_dict('records'):
+                record = {}
+                for key, value in row.items():
+                    if key.startswith(self.JSON_PREFIX):
+                        key = key[len(self.JSON_PREFIX):]
+                        value = json.loads(value) if isinstance(value, str) else None
+                    record[key] = value
+                yield record
+
+
+SINKS = {'jsonl': JsonlSink, 'pickle': PickleSink, 'parquet': ParquetSink}
+
+
+def open_sink(path: str, format: str = 'jsonl', **kwargs) -> ResultSink:
+    """
+    Returns a result sink of given format.
+
+    Args:
+        path (str): Path of the JSON-lines file, or of the directory for 'pickle' and 'parquet' formats.
+        format (str): One of 'jsonl', 'pickle' and 'parquet'.
+        **kwargs: Options of the sink, e.g. `segment_size` or `row_group_size`.
+
+    Returns:
+        ResultSink: The sink.
+    """
+    if format not in SINKS:
+        raise ValueError(f'Unknown sink format {format}, choose one of {list(SINKS)}')
+    return SINKS[format](path, **kwargs)
@@ -39,11 +39,11 @@ class QAOA(Algorithm, AtosRoutine):
         sjob = sjob.circuit.to_job(nbshots=4096)
         sample_result = CLinalg().submit(sjob)
 
-
-        from qiskit_algorithms.minimum_eigensolvers.diagonal_estimator import _evaluate_sparsepauli
+        states = [sample.state.state for sample in sample_result.raw_data]
+        energies = problem.get_energy_evaluator().evaluate_integers(states)
         cheating = {
-            sample.state.state: (sample.probability, _evaluate_sparsepauli(sample.state.state, problem.get_qiskit_hamiltonian()))
-            for sample in sample_result.raw_data
+            state: (sample.probability, energy)
+            for state, sample, energy in zip(states, sample_result.raw_data, energies)
         }
 
         dict_results = {"optimization_result": optimization_result, "sample_result": sample_result,
@@ -0,0 +1,32 @@
+''' Benchmark of QUBO matrix into BinaryQuadraticModel conversion '''
+from timeit import timeit
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from dwave_routines.algorithms import QUBOMatrix
+
+SIZES = [100, 300, 1000]
+
+
+def make_qubo(size: int, seed: int = 0) -> np.ndarray:
+    """ Random dense symmetric QUBO """
+    rng = np.random.default_rng(seed)
+    matrix = rng.uniform(-1, 1, (size, size))
+    return matrix + matrix.T
+
+
+def main():
+    """ main """
+    print(f'{"size":>6} {"pyqubo [s]":>12} {"array [s]":>12} {"sparse [s]":>12} {"speedup":>8}')
+    for size in SIZES:
+        qubo = make_qubo(size)
+        sparse_qubo = csr_matrix(qubo)
+        old = timeit(lambda: QUBOMatrix(qubo, 0).qubo_matrix_into_bqm(symbolic=True), number=1)
+        new = timeit(lambda: QUBOMatrix(qubo, 0).qubo_matrix_into_bqm(), number=1)
+        new_sparse = timeit(lambda: QUBOMatrix(sparse_qubo, 0).qubo_matrix_into_bqm(), number=1)
+        print(f'{size:>6} {old:>12.3f} {new:>12.3f} {new_sparse:>12.3f} {old / new:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
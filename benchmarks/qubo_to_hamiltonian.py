@@ -0,0 +1,33 @@
+''' Benchmark of QUBO matrix into Hamiltonian conversion '''
+from timeit import timeit
+
+import numpy as np
+from scipy.sparse import csr_matrix, random as sparse_random
+
+from utils import _qubo_array_into_hamiltonian, _qubo_matrix_into_hamiltonian
+
+SIZES = [100, 1000, 5000]
+NONZEROS_PER_ROW = 4
+
+
+def make_qubo(size: int, seed: int = 0) -> np.ndarray:
+    """ Random upper triangular QUBO with about NONZEROS_PER_ROW nonzero entries per row """
+    density = min(1, 2 * NONZEROS_PER_ROW / size)
+    matrix = sparse_random(size, size, density=density, random_state=seed, format='csr')
+    return np.triu(matrix.toarray())
+
+
+def main():
+    """ main """
+    print(f'{"size":>6} {"matrix [s]":>12} {"array [s]":>12} {"sparse [s]":>12} {"speedup":>8}')
+    for size in SIZES:
+        qubo = make_qubo(size)
+        sparse_qubo = csr_matrix(qubo)
+        old = timeit(lambda: _qubo_matrix_into_hamiltonian(qubo), number=1)
+        new = timeit(lambda: _qubo_array_into_hamiltonian(qubo), number=1)
+        new_sparse = timeit(lambda: _qubo_array_into_hamiltonian(sparse_qubo), number=1)
+        print(f'{size:>6} {old:>12.3f} {new:>12.3f} {new_sparse:>12.3f} {old / new:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
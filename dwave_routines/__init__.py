@@ -1,3 +1,4 @@
 from .algorithms import DwaveSolver
-from .backend import TabuBackend, DwaveBackend, SimulatedAnnealingBackend
+from .backend import TabuBackend, DwaveBackend, SimulatedAnnealingBackend, PortfolioBackend
+from .portfolio import PortfolioSampler
 from .basic_problems import *
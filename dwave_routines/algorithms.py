@@ -6,11 +6,22 @@ from pyqubo import Spin
 from dimod.binary.binary_quadratic_model import BinaryQuadraticModel
 import dwave.inspector
 from dimod import Sampler, SampleSet
+from scipy.sparse import issparse, triu as sparse_triu
 
 
 class DwaveSolver(Algorithm, DwaveRoutine):
-    def __init__(self, chain_strength, **alg_kwargs) -> None:
+    """
+    Algorithm sampling the BQM of the problem with the sampler of the backend.
+
+    Args:
+        chain_strength: Chain strength used by embedding composites.
+        num_reads (int): Number of reads (split between the samplers of a portfolio backend). Defaults to 1000.
+        **alg_kwargs: Additional keyword arguments for the base class.
+    """
+
+    def __init__(self, chain_strength, num_reads: int = 1000, **alg_kwargs) -> None:
         self.chain_strength = chain_strength
+        self.num_reads = num_reads
         super().__init__(**alg_kwargs)
 
     def run(self, problem: Problem, backend: DwaveRoutine, **kwargs):
@@ -28,7 +39,7 @@ class DwaveSolver(Algorithm, DwaveRoutine):
 
     def _solve_bqm(self, bqm, **kwargs):
         res = self._sampler.sample(
-            bqm, num_reads=1000, label=self.label, chain_strength=self.chain_strength, **kwargs)
+            bqm, num_reads=self.num_reads, label=self.label, chain_strength=self.chain_strength, **kwargs)
         return res
 
     def get_bitstring(self, result: SampleSet) -> str:
@@ -36,6 +47,15 @@ class DwaveSolver(Algorithm, DwaveRoutine):
 
 
 class QUBOMatrix:
+    """
+    QUBO matrix converted into a BinaryQuadraticModel.
+
+    Every entry of the upper triangle (with the lower one removed if the matrix isn't symmetric) is a coupling
+    of spins s_i s_j of variables 'x{i}', diagonal entries are constant, and the model is returned in binary vartype.
+    By default it's built directly from arrays, `symbolic=True` builds it with pyqubo Spin expressions instead.
+    The matrix may be a numpy array, a scipy.sparse matrix or a string with a list of lists.
+    """
+
     def __init__(self, qubo_matrix, offset):
         self.qubo_matrix = qubo_matrix
         self.offset = offset
@@ -47,6 +67,8 @@ class QUBOMatrix:
                 raise SystemExit(
                     """Wrong matrix format, please use list of lists\nIf you are using <nazwa_matrixa> please use -z flag"""
                 )
+        elif not issparse(self.qubo_matrix):
+            self.qubo_matrix = np.asarray(self.qubo_matrix)
 
         self.symetric = True
         self._check_if_symetric()
@@ -55,8 +77,11 @@ class QUBOMatrix:
         """
         Function to check if matrix is symetric
         """
-        self.symetric = (self.qubo_matrix.transpose()
-                         == self.qubo_matrix).all()
+        if issparse(self.qubo_matrix):
+            self.symetric = (self.qubo_matrix != self.qubo_matrix.transpose()).nnz == 0
+        else:
+            self.symetric = (self.qubo_matrix.transpose()
+                             == self.qubo_matrix).all()
         if not self.symetric:
             self.qubo_matrix = self._remove_lower_triangle(self.qubo_matrix)
 
@@ -64,11 +89,7 @@ class QUBOMatrix:
         """
         Function to remove lower triangle from matrix
         """
-        for i in range(len(matrix)):
-            for j in range(len(matrix)):
-                if i > j:
-                    matrix[i][j] = 0
-        return matrix
+        return sparse_triu(matrix, format='csr') if issparse(matrix) else np.triu(matrix)
 
     def _get_values_and_qubits(self, matrix):
         """
@@ -80,12 +101,39 @@ class QUBOMatrix:
         result = {(0,1):1, (0,2):2, (1,0):1, (1,2):3, (2,0):2, (2,1):3}
         Function also return second value which is the number of qubits
         """
+        if issparse(matrix):
+            matrix = matrix.tocoo()
+            result = {(x, y): c for y, x, c in zip(matrix.row, matrix.col, matrix.data) if c != 0}
+            return result, matrix.shape[0]
         result = {
             (x, y): c for y, r in enumerate(matrix) for x, c in enumerate(r) if c != 0
         }
         return result, len(matrix)
 
-    def qubo_matrix_into_bqm(self):
+    def qubo_matrix_into_bqm(self, symbolic: bool = False):
+        """
+        Returns the BinaryQuadraticModel and the compiled pyqubo model (None unless `symbolic`)
+
+        The array path takes the strict upper triangle as spin couplings and the trace as constant with no loop
+        over entries, it contains all variables 'x0', 'x1', ... in order, also the ones without couplings.
+        """
+        if symbolic:
+            return self._qubo_matrix_into_bqm_symbolic()
+        matrix = self.qubo_matrix
+        size = matrix.shape[0]
+        if issparse(matrix):
+            couplings = sparse_triu(matrix, k=1, format='coo')
+            rows, cols, values = couplings.row, couplings.col, couplings.data
+        else:
+            rows, cols = np.nonzero(np.triu(matrix, k=1))
+            values = matrix[rows, cols]
+        bqm = BinaryQuadraticModel.from_numpy_vectors(
+            np.zeros(size), (rows, cols, np.asarray(values, dtype=float)),
+            float(matrix.diagonal().sum()) + self.offset, 'SPIN', variable_order=[f'x{i}' for i in range(size)])
+        bqm.change_vartype('BINARY', inplace=True)
+        return bqm, None
+
+    def _qubo_matrix_into_bqm_symbolic(self):
         values_and_qubits, number_of_qubits = self._get_values_and_qubits(
             self.qubo_matrix
         )
@@ -3,6 +3,7 @@ from .dwave_templates import DwaveRoutine
 from tabu import TabuSampler
 from dwave.system import DWaveSampler, EmbeddingComposite
 from dwave.samplers import SimulatedAnnealingSampler
+from .portfolio import PortfolioSampler
 
 
 class TabuBackend(Backend, DwaveRoutine):
@@ -21,3 +22,14 @@ class SimulatedAnnealingBackend(Backend, DwaveRoutine):
     def __init__(self, name: str = "SimulatedAnnealingSampler", parameters: list = None) -> None:
         super().__init__(name, parameters)
         self.sampler = SimulatedAnnealingSampler()
+
+
+class PortfolioBackend(Backend, DwaveRoutine):
+    """ Backend running a portfolio of local samplers concurrently, see `PortfolioSampler` for the arguments """
+
+    def __init__(self, name: str = "PortfolioSampler", parameters: list = None,
+                 portfolio: list[tuple[str, dict]] | None = None, repeats: int = 1, max_workers: int | None = None,
+                 target_energy: float | None = None, time_limit: float | None = None) -> None:
+        super().__init__(name, parameters)
+        self.sampler = PortfolioSampler(portfolio, repeats=repeats, max_workers=max_workers,
+                                        target_energy=target_energy, time_limit=time_limit)
@@ -1,4 +1,3 @@
-import numpy as np
 from problems import EC, JSSP, MaxCut, QATM, Raw, Problem
 from qiskit_routines.basic_problems import (
     ECQiskit,
@@ -8,8 +7,8 @@ from qiskit_routines.basic_problems import (
 )
 from .dwave_templates import DwaveRoutine
 from qiskit.quantum_info import SparsePauliOp
-from qiskit_optimization.converters import QuadraticProgramToQubo
-from qiskit_optimization.translators import from_ising
+from scipy.sparse import csr_matrix
+from utils import hamiltonian_to_qubo
 
 
 class QiskitToDwave:
@@ -17,11 +16,8 @@ class QiskitToDwave:
     def get_qubo(self):
         return self._hamiltonian_to_qubo(self.get_qiskit_hamiltonian())
 
-    def _hamiltonian_to_qubo(self, hamiltonian: SparsePauliOp) -> tuple[np.ndarray, float]:
-        qp = from_ising(hamiltonian)
-        conv = QuadraticProgramToQubo()
-        qubo = conv.convert(qp).objective
-        return qubo.quadratic.to_array(), qubo.constant
+    def _hamiltonian_to_qubo(self, hamiltonian: SparsePauliOp) -> tuple[csr_matrix, float]:
+        return hamiltonian_to_qubo(hamiltonian, sparse=True)
 
 
 class ECDwave(ECQiskit, EC, QiskitToDwave, DwaveRoutine):
@@ -33,7 +29,9 @@ class JSSPDwave(JSSPQiskit, JSSP, QiskitToDwave, DwaveRoutine):
 
 
 class MaxCutDwave(MaxCutQiskit, MaxCut, QiskitToDwave, DwaveRoutine):
-    pass
+    @Problem.output
+    def get_qubo(self):
+        return self.get_qubo_matrix()
 
 
 class QATMDwave(QATMQiskit, QATM, QiskitToDwave, DwaveRoutine):
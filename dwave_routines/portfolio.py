@@ -0,0 +1,164 @@
+""" Portfolio of local dimod samplers run concurrently in a process pool """
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import dimod
+import numpy as np
+from dimod.binary.binary_quadratic_model import BinaryQuadraticModel
+from dwave.samplers import RandomSampler, SimulatedAnnealingSampler, SteepestDescentSolver
+from tabu import TabuSampler
+
+LOCAL_SAMPLERS = {
+    'tabu': TabuSampler,
+    'simulated_annealing': SimulatedAnnealingSampler,
+    'steepest_descent': SteepestDescentSolver,
+    'random': RandomSampler,
+}
+SAMPLER_NAME_LENGTH = max(map(len, LOCAL_SAMPLERS))
+
+
+def _share_bqm(bqm: BinaryQuadraticModel) -> tuple[shared_memory.SharedMemory, dict]:
+    """ Copies numpy vectors of the BQM into one shared memory block, returns the block and layout of arrays """
+    linear, (rows, cols, biases), offset = bqm.to_numpy_vectors(variable_order=range(bqm.num_variables))
+    arrays = {'linear': np.asarray(linear, dtype=np.float64), 'rows': np.asarray(rows, dtype=np.int64),
+              'cols': np.asarray(cols, dtype=np.int64), 'biases': np.asarray(biases, dtype=np.float64)}
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(array.nbytes for array in arrays.values())))
+    layout = {'offset': float(offset), 'vartype': bqm.vartype.name, 'arrays': {}}
+    start = 0
+    for name, array in arrays.items():
+        np.ndarray(array.shape, array.dtype, buffer=block.buf, offset=start)[:] = array
+        layout['arrays'][name] = (start, array.shape, array.dtype.str)
+        start += array.nbytes
+    return block, layout
+
+
+def _attach_bqm(name: str, layout: dict) -> BinaryQuadraticModel:
+    """ Rebuilds the BQM with integer variables from the shared memory block """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        arrays = {key: np.ndarray(shape, dtype, buffer=block.buf, offset=start).copy()
+                  for key, (start, shape, dtype) in layout['arrays'].items()}
+    finally:
+        block.close()
+    return BinaryQuadraticModel.from_numpy_vectors(
+        arrays['linear'], (arrays['rows'], arrays['cols'], arrays['biases']), layout['offset'], layout['vartype'])
+
+
+def _sample(name: str, layout: dict, sampler_name: str, sample_kwargs: dict, deadline: float | None,
+            target_energy: float | None) -> tuple[str, dimod.SampleSet, float]:
+    bqm = _attach_bqm(name, layout)
+    sampler = LOCAL_SAMPLERS[sampler_name]()
+    kwargs = {key: value for key, value in sample_kwargs.items() if key in sampler.parameters}
+    if deadline is not None and 'interrupt_function' in sampler.parameters:
+        kwargs.setdefault('interrupt_function', lambda: time.time() > deadline)
+    if deadline is not None and 'timeout' in sampler.parameters:
+        remaining_ms = 1000 * (deadline - time.time()) / kwargs.get('num_reads', 1)
+        kwargs.setdefault('timeout', max(1, int(remaining_ms)))
+    if target_energy is not None and 'energy_threshold' in sampler.parameters:
+        kwargs.setdefault('energy_threshold', target_energy)
+    start = time.perf_counter()
+    sampleset = sampler.sample(bqm, **kwargs)
+    return sampler_name, sampleset, time.perf_counter() - start
+
+
+class PortfolioSampler(dimod.Sampler):
+    """
+    Runs several local samplers concurrently on the same BQM and merges their SampleSets.
+
+    The BQM is put into shared memory once as numpy vectors and every worker process rebuilds it from there.
+    Each portfolio entry is run `repeats` times (with different seeds where supported) and `num_reads`
+    is split between the repetitions. Sampling stops early when a sample reaches `target_energy` or
+    `time_limit` seconds pass (but not before the first sampler finishes); samplers supporting it (interrupt function,
+    timeout or energy threshold) are also stopped from inside, the other ones are only cancelled when not started yet.
+    After an early stop `sample` returns without joining the workers: samplers already running without support of
+    interruption keep their processes busy until they finish (their results are discarded), and the shared memory
+    is unlinked at once, so workers which haven't attached the BQM yet fail without effect. Use interruptible
+    samplers or a `time_limit` in such portfolios to free the cores early.
+    The merged SampleSet has a 'sampler' vector with the name of the sampler of every sample (other data vectors
+    are dropped), its info lists time and best energy of every sampler.
+
+    Attributes:
+        portfolio (list[tuple[str, dict]]): Names of samplers (keys of `LOCAL_SAMPLERS`) with their sample kwargs.
+        repeats (int): Number of runs of every entry.
+        max_workers (int | None): Number of worker processes, defaults to the number of CPUs.
+        target_energy (float | None): Energy at which sampling stops.
+        time_limit (float | None): Time budget of sampling in seconds.
+        mp_context: Multiprocessing context of the pool.
+
+    Example of usage:
+        backend = PortfolioBackend(repeats=16, time_limit=30)
+        solver = DwaveSolver(1, num_reads=4096)
+        result = QuantumLauncher(problem, solver, backend).process()
+    """
+    DEFAULT_PORTFOLIO = [('tabu', {}), ('simulated_annealing', {}), ('steepest_descent', {})]
+
+    def __init__(self, portfolio: list[tuple[str, dict]] | None = None, repeats: int = 1,
+                 max_workers: int | None = None, target_energy: float | None = None,
+                 time_limit: float | None = None, mp_context=None) -> None:
+        self.portfolio = list(self.DEFAULT_PORTFOLIO if portfolio is None else portfolio)
+        for sampler_name, _ in self.portfolio:
+            if sampler_name not in LOCAL_SAMPLERS:
+                raise ValueError(f'Unknown sampler {sampler_name}, choose from {list(LOCAL_SAMPLERS)}')
+        self.repeats = repeats
+        self.max_workers = max_workers
+        self.target_energy = target_energy
+        self.time_limit = time_limit
+        self.mp_context = mp_context
+
+    @property
+    def parameters(self) -> dict:
+        return {'num_reads': [], 'seed': [], 'target_energy': [], 'time_limit': []}
+
+    @property
+    def properties(self) -> dict:
+        return {'portfolio': [sampler_name for sampler_name, _ in self.portfolio], 'repeats': self.repeats}
+
+    def sample(self, bqm: BinaryQuadraticModel, num_reads: int = 1, seed: int | None = None,
+               target_energy: float | None = None, time_limit: float | None = None,
+               **kwargs) -> dimod.SampleSet:
+        target_energy = self.target_energy if target_energy is None else target_energy
+        time_limit = self.time_limit if time_limit is None else time_limit
+        deadline = None if time_limit is None else time.time() + time_limit
+        reads = max(1, math.ceil(num_reads / self.repeats))
+        # some samplers (e.g. simulated annealing) accept only seeds below 2^31
+        seeds = np.random.SeedSequence(seed).generate_state(len(self.portfolio) * self.repeats) >> 1
+
+        variables = list(bqm.variables)
+        integer_bqm = bqm.relabel_variables(dict(zip(variables, range(len(variables)))), inplace=False)
+        block, layout = _share_bqm(integer_bqm)
+        samplesets, info, stopped_early = [], {}, False
+        executor = ProcessPoolExecutor(self.max_workers, mp_context=self.mp_context)
+        try:
+            running = set()
+            for index, (sampler_name, sample_kwargs) in enumerate(self.portfolio * self.repeats):
+                sample_kwargs = {**kwargs, 'num_reads': reads, 'seed': int(seeds[index]), **sample_kwargs}
+                running.add(executor.submit(_sample, block.name, layout, sampler_name, sample_kwargs,
+                                            deadline, target_energy))
+            while running:
+                timeout = None if deadline is None or not samplesets else max(0.0, deadline - time.time())
+                done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    sampler_name, sampleset, seconds = future.result()
+                    samplesets.append(dimod.SampleSet.from_samples(
+                        (sampleset.record.sample, sampleset.variables), sampleset.vartype,
+                        energy=sampleset.record.energy, num_occurrences=sampleset.record.num_occurrences,
+                        sampler=np.full(len(sampleset), sampler_name, dtype=f'U{SAMPLER_NAME_LENGTH}')))
+                    best = float(sampleset.first.energy) if len(sampleset) else math.inf
+                    entry = info.setdefault(sampler_name, {'time': 0.0, 'best_energy': math.inf})
+                    entry['time'] += seconds
+                    entry['best_energy'] = min(entry['best_energy'], best)
+                reached = target_energy is not None and any(
+                    entry['best_energy'] <= target_energy for entry in info.values())
+                if running and (reached or (deadline is not None and time.time() >= deadline)):
+                    stopped_early = True
+                    break
+        finally:
+            executor.shutdown(wait=not stopped_early, cancel_futures=True)
+            block.close()
+            block.unlink()
+
+        sampleset = dimod.concatenate(samplesets).relabel_variables(dict(enumerate(variables)), inplace=False)
+        sampleset.info.update(samplers=info, stopped_early=stopped_early)
+        return sampleset
@@ -0,0 +1,257 @@
+""" Content-addressed on-disk cache for problem encodings (Hamiltonians, QUBOs and BQMs) """
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import zipfile
+from typing import Any, Callable
+
+import dimod
+import networkx as nx
+import numpy as np
+import pandas as pd
+from qiskit.quantum_info import PauliList, SparsePauliOp
+from scipy.sparse import csr_matrix, issparse
+
+
+def fingerprint(*objects) -> str:
+    """
+    Returns sha256 hex digest of the contents of given objects.
+
+    Containers are hashed recursively; dicts, lists and graphs are order sensitive, sets are not.
+    Numpy arrays, DataFrames, SparsePauliOps and sparse matrices are hashed by their raw data.
+
+    Args:
+        *objects: Objects to be hashed.
+
+    Returns:
+        str: Hex digest.
+    """
+    hasher = hashlib.sha256()
+    for obj in objects:
+        _update(hasher, obj)
+    return hasher.hexdigest()
+
+
+def _update(hasher, obj) -> None:
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        hasher.update(f'{type(obj).__name__}:{obj!r};'.encode())
+    elif isinstance(obj, np.generic):
+        _update(hasher, obj.item())
+    elif isinstance(obj, np.ndarray):
+        hasher.update(f'ndarray:{obj.dtype.str}:{obj.shape};'.encode())
+        hasher.update(np.ascontiguousarray(obj).tobytes() if obj.dtype != object else pickle.dumps(obj.tolist()))
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(f'{type(obj).__name__}:{len(obj)};'.encode())
+        for item in obj:
+            _update(hasher, item)
+    elif isinstance(obj, dict):
+        hasher.update(f'dict:{len(obj)};'.encode())
+        for key, value in obj.items():
+            _update(hasher, key)
+            _update(hasher, value)
+    elif isinstance(obj, (set, frozenset)):
+        hasher.update(f'set:{len(obj)};'.encode())
+        for digest in sorted(fingerprint(item) for item in obj):
+            hasher.update(digest.encode())
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        hasher.update(f'{type(obj).__name__}:{obj.shape};'.encode())
+        _update(hasher, list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name)
+        hasher.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, nx.Graph):
+        hasher.update(f'{type(obj).__name__};'.encode())
+        _update(hasher, list(obj.nodes(data=True)))
+        _update(hasher, list(obj.edges(data=True)))
+    elif isinstance(obj, SparsePauliOp):
+        hasher.update(f'SparsePauliOp:{obj.num_qubits};'.encode())
+        _update(hasher, obj.paulis.z)
+        _update(hasher, obj.paulis.x)
+        _update(hasher, obj.coeffs)
+    elif issparse(obj):
+        matrix = csr_matrix(obj)
+        matrix.sum_duplicates()
+        hasher.update(f'sparse:{matrix.shape};'.encode())
+        for array in (matrix.data, matrix.indices, matrix.indptr):
+            _update(hasher, array)
+    else:
+        hasher.update(f'{type(obj).__qualname__};'.encode())
+        hasher.update(pickle.dumps(obj))
+
+
+class EncodingCache:
+    """
+    Content-addressed on-disk cache of `Problem.output` results.
+
+    Entries are keyed by a hash of the problem class, the output method with its arguments,
+    the instance data and the problem's encoding parameters (`Problem.encoding_parameters`),
+    so processes sharing a directory share the encodings. SparsePauliOps, numpy arrays, scipy.sparse matrices,
+    dimod BQMs, scalars and tuples of them are stored as uncompressed .npz files without pickling;
+    other results (e.g. functions) are not cached. When the directory grows above `max_size` bytes,
+    least recently used entries are removed.
+
+    Attributes:
+        directory (str): Directory with cache entries, created if it doesn't exist.
+        max_size (int): Size limit of the directory in bytes.
+        hits (int): Number of results read from the cache.
+        misses (int): Number of results computed.
+
+    Example of usage:
+        from encoding_cache import EncodingCache
+        from templates import QuantumLauncher
+
+        launcher = QuantumLauncher(problem, algorithm, backend, encoding_cache=EncodingCache('/scratch/encodings'))
+    """
+    SUFFIX = '.npz'
+
+    def __init__(self, directory: str, max_size: int = 2 ** 30) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, problem, func: Callable, args: tuple = (), kwargs: dict | None = None) -> str:
+        """ Returns the key of problem's output method called with given arguments """
+        return fingerprint(type(problem).__module__, type(problem).__qualname__, func.__qualname__,
+                           args, kwargs or {}, problem.instance, problem.encoding_parameters)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """ Returns cached value, or default if there is no readable entry """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            os.utime(path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return default
+        return _unpack(json.loads(str(arrays.pop('spec'))), arrays)
+
+    def put(self, key: str, value: Any) -> bool:
+        """ Stores the value, returns False if it cannot be stored """
+        arrays = {}
+        try:
+            spec = _pack(value, arrays)
+        except TypeError:
+            return False
+        descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                np.savez(file, spec=np.array(json.dumps(spec)), **arrays)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            _remove(tmp_path)
+            raise
+        self._evict()
+        return True
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """ Returns cached value, or computes and stores it """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            _remove(entry.path)
+
+    def _entries(self) -> list:
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.name.endswith(self.SUFFIX) and entry.is_file()]
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            _remove(path)
+            total -= size
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _pack(value: Any, arrays: dict) -> dict:
+    """ Returns json-able description of the value, while its arrays are put into `arrays` """
+    def add(array: np.ndarray) -> str:
+        if array.dtype == object:
+            raise TypeError('object arrays are not supported')
+        name = f'a{len(arrays)}'
+        arrays[name] = array
+        return name
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return {'type': 'scalar', 'value': value}
+    if isinstance(value, np.generic):
+        return {'type': 'array', 'array': add(np.asarray(value)), 'scalar': True}
+    if isinstance(value, complex):
+        return {'type': 'complex', 'value': [value.real, value.imag]}
+    if isinstance(value, np.ndarray):
+        return {'type': 'array', 'array': add(value)}
+    if isinstance(value, (tuple, list)):
+        return {'type': type(value).__name__, 'items': [_pack(item, arrays) for item in value]}
+    if isinstance(value, SparsePauliOp):
+        return {'type': 'SparsePauliOp', 'num_qubits': value.num_qubits,
+                'z': add(np.packbits(value.paulis.z, axis=1)), 'x': add(np.packbits(value.paulis.x, axis=1)),
+                'coeffs': add(value.coeffs)}
+    if issparse(value):
+        matrix = csr_matrix(value)
+        return {'type': 'csr_matrix', 'shape': list(matrix.shape), 'data': add(matrix.data),
+                'indices': add(matrix.indices), 'indptr': add(matrix.indptr)}
+    if isinstance(value, dimod.BinaryQuadraticModel):
+        labels = list(value.variables)
+        json.dumps(labels)
+        if any(isinstance(label, (list, tuple)) for label in labels):
+            raise TypeError('BQM labels must be json scalars')
+        linear, (first, second, bias), offset = value.to_numpy_vectors(variable_order=labels)
+        return {'type': 'bqm', 'vartype': value.vartype.name, 'labels': labels, 'offset': float(offset),
+                'linear': add(linear), 'first': add(first), 'second': add(second), 'bias': add(bias)}
+    raise TypeError(f'Values of type {type(value)} cannot be cached')
+
+
+def _unpack(spec: dict, arrays: dict) -> Any:
+    match spec['type']:
+        case 'scalar':
+            return spec['value']
+        case 'complex':
+            return complex(*spec['value'])
+        case 'array':
+            array = arrays[spec['array']]
+            return array[()] if spec.get('scalar') else array
+        case 'tuple':
+            return tuple(_unpack(item, arrays) for item in spec['items'])
+        case 'list':
+            return [_unpack(item, arrays) for item in spec['items']]
+        case 'SparsePauliOp':
+            num_qubits = spec['num_qubits']
+            z = np.unpackbits(arrays[spec['z']], axis=1, count=num_qubits).astype(bool)
+            x = np.unpackbits(arrays[spec['x']], axis=1, count=num_qubits).astype(bool)
+            return SparsePauliOp(PauliList.from_symplectic(z, x), arrays[spec['coeffs']])
+        case 'csr_matrix':
+            return csr_matrix((arrays[spec['data']], arrays[spec['indices']], arrays[spec['indptr']]),
+                              shape=tuple(spec['shape']))
+        case 'bqm':
+            quadratic = (arrays[spec['first']], arrays[spec['second']], arrays[spec['bias']])
+            return dimod.BinaryQuadraticModel.from_numpy_vectors(arrays[spec['linear']], quadratic, spec['offset'],
+                                                                spec['vartype'], variable_order=spec['labels'])
+    raise ValueError(f'Unknown cache entry type {spec["type"]}')
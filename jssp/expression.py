@@ -0,0 +1,143 @@
+import dimod
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+from utils import _qubo_coo_into_hamiltonian
+
+
+class QuadraticExpression:
+    """
+    Accumulator of a quadratic expression over binary variables.
+
+    Replacement of the `Binary` algebra: terms are added in place, labels are interned into integer indices
+    and coefficients are kept in index arrays, so building an expression is linear in the number of terms.
+    Single terms and numpy arrays of indices can be added alike. Since variables are binary, x * x = x.
+
+    Example:
+        H = QuadraticExpression()
+        a, b = H.variable('a'), H.variable('b')
+        H.add_squared_sum([a, b], constant=-1)  # (a + b - 1) ** 2
+        H.add_quadratic(a, b, 2)
+        bqm = H.compile().to_bqm()
+    """
+
+    def __init__(self) -> None:
+        self.index_by_label: dict = {}
+        self.labels: list = []
+        self.offset: float = 0
+        self._linear = ([], [], [])
+        self._quadratic = ([], [], [], [])
+        self._compiled = None
+
+    @property
+    def num_variables(self) -> int:
+        return len(self.labels)
+
+    def variable(self, label) -> int:
+        """ Returns index of the variable, creating it if it doesn't exist """
+        index = self.index_by_label.get(label)
+        if index is None:
+            index = self.index_by_label[label] = len(self.labels)
+            self.labels.append(label)
+        return index
+
+    def add_offset(self, value: float) -> 'QuadraticExpression':
+        self.offset += value
+        return self
+
+    def add_linear(self, index, bias: float) -> 'QuadraticExpression':
+        """ Adds bias * x_index, index and bias can be arrays """
+        self._compiled = None
+        if np.isscalar(index):
+            self._linear[0].append(index)
+            self._linear[1].append(bias)
+        else:
+            index = np.asarray(index, dtype=np.int64)
+            self._linear[2].append((index, np.broadcast_to(np.asarray(bias, dtype=float), index.shape)))
+        return self
+
+    def add_quadratic(self, first, second, bias: float) -> 'QuadraticExpression':
+        """ Adds bias * x_first * x_second, indices and bias can be arrays """
+        self._compiled = None
+        if np.isscalar(first) and np.isscalar(second):
+            self._quadratic[0].append(first)
+            self._quadratic[1].append(second)
+            self._quadratic[2].append(bias)
+        else:
+            first, second = np.broadcast_arrays(np.asarray(first, dtype=np.int64), np.asarray(second, dtype=np.int64))
+            self._quadratic[3].append((first, second, np.broadcast_to(np.asarray(bias, dtype=float), first.shape)))
+        return self
+
+    def add_squared_sum(self, indices, constant: float = 0, lagrange: float = 1,
+                        coefficients=1) -> 'QuadraticExpression':
+        """ Adds lagrange * (constant + sum_i coefficients_i * x_indices_i) ** 2 """
+        indices = np.asarray(indices, dtype=np.int64)
+        coefficients = np.broadcast_to(np.asarray(coefficients, dtype=float), indices.shape)
+        first, second = np.triu_indices(len(indices), 1)
+        self.add_offset(lagrange * constant ** 2)
+        self.add_linear(indices, lagrange * (coefficients ** 2 + 2 * constant * coefficients))
+        self.add_quadratic(indices[first], indices[second], 2 * lagrange * coefficients[first] * coefficients[second])
+        return self
+
+    def add(self, other: 'QuadraticExpression', scale: float = 1) -> 'QuadraticExpression':
+        """ Adds scale * other, variables of other are matched by label """
+        linear, (first, second, bias), offset = other.compile().get_arrays()
+        mapping = np.array([self.variable(label) for label in other.labels], dtype=np.int64)
+        self.add_linear(mapping, scale * linear)
+        self.add_quadratic(mapping[first], mapping[second], scale * bias)
+        return self.add_offset(scale * offset)
+
+    def copy(self) -> 'QuadraticExpression':
+        return QuadraticExpression().add(self)
+
+    def compile(self) -> 'QuadraticExpression':
+        """ Merges all the terms, quadratic terms are stored once with first < second """
+        if self._compiled is not None:
+            return self
+        n = self.num_variables
+        index, bias, chunks = self._linear
+        linear_index = np.concatenate([np.asarray(index, dtype=np.int64)] + [c[0] for c in chunks])
+        linear_bias = np.concatenate([np.asarray(bias, dtype=float)] + [c[1] for c in chunks])
+
+        first, second, bias, chunks = self._quadratic
+        first = np.concatenate([np.asarray(first, dtype=np.int64)] + [c[0] for c in chunks])
+        second = np.concatenate([np.asarray(second, dtype=np.int64)] + [c[1] for c in chunks])
+        bias = np.concatenate([np.asarray(bias, dtype=float)] + [c[2] for c in chunks])
+
+        diagonal = first == second
+        linear = np.bincount(np.concatenate([linear_index, first[diagonal]]),
+                             weights=np.concatenate([linear_bias, bias[diagonal]]), minlength=n)
+        lower, upper = np.minimum(first[~diagonal], second[~diagonal]), np.maximum(first[~diagonal], second[~diagonal])
+        pairs, inverse = np.unique(lower * n + upper, return_inverse=True)
+        quadratic = np.bincount(inverse.ravel(), weights=bias[~diagonal], minlength=len(pairs))
+        lower, upper = np.divmod(pairs, n) if n else (pairs, pairs)
+
+        self._linear = ([], [], [(np.arange(n), linear)])
+        self._quadratic = ([], [], [], [(lower, upper, quadratic)])
+        self._compiled = (linear, (lower, upper, quadratic))
+        return self
+
+    def get_arrays(self) -> tuple[np.ndarray, tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+        """ Returns linear biases, quadratic (first, second, bias) arrays and offset of the compiled expression """
+        linear, quadratic = self.compile()._compiled
+        return linear, quadratic, self.offset
+
+    def to_bqm(self) -> dimod.BinaryQuadraticModel:
+        """ Returns binary BQM with variables labeled and ordered as in `labels` """
+        linear, quadratic, offset = self.get_arrays()
+        return dimod.BinaryQuadraticModel.from_numpy_vectors(linear, quadratic, offset, dimod.BINARY,
+                                                            variable_order=self.labels)
+
+    def to_qubo(self) -> tuple[np.ndarray, float]:
+        """ Returns upper triangular QUBO matrix and offset """
+        linear, (first, second, bias), offset = self.get_arrays()
+        qubo = np.diag(linear)
+        qubo[first, second] = bias
+        return qubo, offset
+
+    def to_hamiltonian(self) -> SparsePauliOp:
+        linear, (first, second, bias), offset = self.get_arrays()
+        n = self.num_variables
+        return _qubo_coo_into_hamiltonian(n, np.concatenate([np.arange(n), first]),
+                                          np.concatenate([np.arange(n), second]),
+                                          np.concatenate([linear, bias]), offset)
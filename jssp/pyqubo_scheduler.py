@@ -3,7 +3,7 @@ from __future__ import print_function
 from bisect import bisect_right
 
 # from pyqubo import Binary
-from .Binary import Binary
+from .expression import QuadraticExpression
 
 from jssp.scheduler import JobShopScheduler, KeyList
 from jssp.scheduler import get_label
@@ -29,23 +29,15 @@ class DWaveScheduler(JobShopScheduler):
 
     def __init__(self, job_dict, max_time=None):
         super().__init__(job_dict, max_time)
+        self.H = QuadraticExpression()
 
     def _add_one_start_constraint(self, lagrange_one_hot=1):
         """self.csp gets the constraint: A task can start once and only once
         """
         for task in self.tasks:
-            task_times = {get_label(task, t) for t in range(self.max_time)}
-            H_term = 0
-            for label in task_times:
-                if label in self.absurd_times:
-                    continue
-                if label not in self.H_vars:
-                    var = Binary(label)
-                    self.H_vars[label] = var
-                else:
-                    var = self.H_vars[label]
-                H_term += var
-            self.H += lagrange_one_hot * ((1 - H_term) ** 2)
+            task_vars = [self.H.variable(label) for label in (get_label(task, t) for t in range(self.max_time))
+                         if label not in self.absurd_times]
+            self.H.add_squared_sum(task_vars, constant=-1, lagrange=lagrange_one_hot)
 
     def _add_precedence_constraint(self, lagrange_precedence=1):
         """self.csp gets the constraint: Task must follow a particular order.
@@ -60,25 +52,16 @@ class DWaveScheduler(JobShopScheduler):
                 current_label = get_label(current_task, t)
                 if current_label in self.absurd_times:
                     continue
-
-                if current_label not in self.H_vars:
-                    var1 = Binary(current_label)
-                    self.H_vars[current_label] = var1
-                else:
-                    var1 = self.H_vars[current_label]
+                var1 = self.H.variable(current_label)
 
                 for tt in range(min(t + current_task.duration, self.max_time)):
 
                     next_label = get_label(next_task, tt)
                     if next_label in self.absurd_times:
                         continue
-                    if next_label not in self.H_vars:
-                        var2 = Binary(next_label)
-                        self.H_vars[next_label] = var2
-                    else:
-                        var2 = self.H_vars[next_label]
+                    var2 = self.H.variable(next_label)
 
-                    self.H += lagrange_precedence * var1 * var2
+                    self.H.add_quadratic(var1, var2, lagrange_precedence)
 
     def _add_share_machine_constraint(self, lagrange_share=1):
         """self.csp gets the constraint: At most one task per machine per time unit
@@ -111,24 +94,15 @@ class DWaveScheduler(JobShopScheduler):
                         current_label = get_label(task, t)
                         if current_label in self.absurd_times:
                             continue
-
-                        if current_label not in self.H_vars:
-                            var1 = Binary(current_label)
-                            self.H_vars[current_label] = var1
-                        else:
-                            var1 = self.H_vars[current_label]
+                        var1 = self.H.variable(current_label)
 
                         for tt in range(t, min(t + task.duration, self.max_time)):
                             this_label = get_label(other_task, tt)
                             if this_label in self.absurd_times:
                                 continue
-                            if this_label not in self.H_vars:
-                                var2 = Binary(this_label)
-                                self.H_vars[this_label] = var2
-                            else:
-                                var2 = self.H_vars[this_label]
+                            var2 = self.H.variable(this_label)
 
-                            self.H += lagrange_share * var1 * var2
+                            self.H.add_quadratic(var1, var2, lagrange_share)
 
     def get_bqm(self, disable_till, disable_since, disabled_variables,
                 lagrange_one_hot, lagrange_precedence, lagrange_share):
@@ -196,12 +170,7 @@ class DWaveScheduler(JobShopScheduler):
                 label = get_label(task, t)
                 if label in self.absurd_times:
                     continue
-                if label not in self.H_vars:
-                    var = Binary(label)
-                    self.H_vars[label] = var
-                else:
-                    var = self.H_vars[label]
-                self.H += var * bias
+                self.H.add_linear(self.H.variable(label), bias)
 
         # Get BQM
         self.model = self.H.compile()
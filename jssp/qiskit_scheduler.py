@@ -1,18 +1,58 @@
 from __future__ import print_function
 
 from bisect import bisect_right
+from functools import lru_cache
 
 import hampy
+from qiskit.quantum_info import SparsePauliOp
 
+from jssp.qubo_scheduler import QuboScheduler
 from jssp.scheduler import JobShopScheduler, KeyList
 from jssp.scheduler import get_label
 
 
 def get_jss_hamiltonian(job_dict, max_time, onehot):
-    scheduler = QiskitScheduler(job_dict, max_time, onehot)
+    scheduler = QuboScheduler(job_dict, max_time, onehot)
     return scheduler.get_hamiltonian()
 
 
+def get_jss_hamiltonian_variant(job_dict, max_time, onehot, optimization=False) -> SparsePauliOp:
+    """
+    Returns only the decision or only the optimization Hamiltonian.
+
+    Results are memoized on the instance contents, max_time, onehot and variant, so problems created
+    repeatedly for the same instance share the build. The returned operator is shared, don't modify it in place.
+    """
+    return _cached_jss_hamiltonian(_instance_key(job_dict), max_time, onehot, optimization)
+
+
+def get_jss_pos_by_label(job_dict, max_time, onehot) -> dict:
+    """ Returns the memoized qubit index by label dictionary, it's shared, don't modify it """
+    return _cached_jss_scheduler(_instance_key(job_dict), max_time, onehot).H_pos_by_label
+
+
+def get_jss_label_by_pos(job_dict, max_time, onehot) -> dict:
+    """ Returns the memoized label by qubit index dictionary, it's shared, don't modify it """
+    return _cached_jss_scheduler(_instance_key(job_dict), max_time, onehot).H_label_by_pos
+
+
+def _instance_key(job_dict) -> tuple:
+    return tuple((job, tuple(tuple(operation) for operation in operations))
+                 for job, operations in job_dict.items())
+
+
+@lru_cache(maxsize=16)
+def _cached_jss_scheduler(instance_key, max_time, onehot) -> QuboScheduler:
+    scheduler = QuboScheduler(dict(instance_key), max_time, onehot)
+    scheduler.build()
+    return scheduler
+
+
+@lru_cache(maxsize=32)
+def _cached_jss_hamiltonian(instance_key, max_time, onehot, optimization) -> SparsePauliOp:
+    return _cached_jss_scheduler(instance_key, max_time, onehot).to_hamiltonian(optimization)
+
+
 class QiskitScheduler(JobShopScheduler):
 
     def __init__(self, job_dict, max_time=None, onehot='exact'):
@@ -0,0 +1,158 @@
+from bisect import bisect_right
+
+import dimod
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+from jssp.expression import QuadraticExpression
+from jssp.scheduler import JobShopScheduler, KeyList
+from jssp.scheduler import get_label
+from utils import exact_onehot_hamiltonian
+
+
+class QuboScheduler(JobShopScheduler):
+    """
+    Job Shop Scheduler accumulating penalty terms as (i, j, weight) coordinate arrays.
+
+    Constraints are accumulated in a `QuadraticExpression` with qubit indices as variable indices,
+    and are converted into a SparsePauliOp, dense QUBO matrix or dimod BQM only at the end.
+    The penalties are the same as in `QiskitScheduler`. The 'exact' onehot constraint is not quadratic,
+    so it is added in `to_hamiltonian` with `exact_onehot_hamiltonian` from the onehot groups in one step,
+    and it's not available in `to_qubo` and `to_bqm`.
+    """
+
+    def __init__(self, job_dict, max_time=None, onehot='exact'):
+        super().__init__(job_dict, max_time)
+        self.H_pos_by_label = dict()
+        self.H_label_by_pos = dict()
+        self.onehot = onehot
+        self.onehot_groups = []
+        self.H = QuadraticExpression()
+        self._objective = []
+        self._positions_by_task = {}
+        self._built = False
+
+    def _positions(self, task):
+        """ Qubit index of the task for every start time, -1 for absurd times """
+        key = (task.job, task.position)
+        if key not in self._positions_by_task:
+            positions = np.full(self.max_time, -1, dtype=np.int64)
+            for t in range(self.max_time):
+                label = get_label(task, t)
+                if label not in self.absurd_times:
+                    positions[t] = self.H_pos_by_label[label]
+            self._positions_by_task[key] = positions
+        return self._positions_by_task[key]
+
+    def _add_pair_penalty(self, positions1, positions2, mask, lagrange):
+        """ Adds lagrange * x_i * x_j for every (t, tt) start time pair selected by the mask """
+        t, tt = np.nonzero(mask & (positions1 >= 0)[:, None] & (positions2 >= 0)[None, :])
+        self.H.add_quadratic(positions1[t], positions2[tt], lagrange)
+
+    def _add_one_start_constraint(self, lagrange_one_hot=1):
+        for task in self.tasks:
+            positions = self._positions(task)
+            group = positions[positions >= 0]
+            self.onehot_groups.append(group.tolist())
+            if self.onehot == 'quadratic':
+                self.H.add_squared_sum(group, constant=-1, lagrange=lagrange_one_hot)
+
+    def _add_precedence_constraint(self, lagrange_precedence=1):
+        times = np.arange(self.max_time)
+        for current_task, next_task in zip(self.tasks, self.tasks[1:]):
+            if current_task.job != next_task.job:
+                continue
+            mask = times[None, :] < times[:, None] + current_task.duration
+            self._add_pair_penalty(self._positions(current_task), self._positions(next_task),
+                                   mask, lagrange_precedence)
+
+    def _add_share_machine_constraint(self, lagrange_share=1):
+        sorted_tasks = sorted(self.tasks, key=lambda x: x.machine)
+        wrapped_tasks = KeyList(sorted_tasks, lambda x: x.machine)
+        times = np.arange(self.max_time)
+
+        head = 0
+        while head < len(sorted_tasks):
+
+            tail = bisect_right(wrapped_tasks, sorted_tasks[head].machine)
+            same_machine_tasks = sorted_tasks[head:tail]
+
+            head = tail
+
+            if len(same_machine_tasks) < 2:
+                continue
+
+            for task in same_machine_tasks:
+                mask = (times[None, :] >= times[:, None]) & (times[None, :] < times[:, None] + task.duration)
+                for other_task in same_machine_tasks:
+                    if task.job == other_task.job and task.position == other_task.position:
+                        continue
+                    self._add_pair_penalty(self._positions(task), self._positions(other_task),
+                                           mask, lagrange_share)
+
+    def _add_objective(self):
+        """ Penalizes every start time of the last tasks which ends before max_time, as in `QiskitScheduler` """
+        for i in self.last_task_indices:
+            task = self.tasks[i]
+            positions = self._positions(task)[:max(self.max_time - task.duration + 1, 0)]
+            self._objective.append(positions[positions >= 0])
+
+    def _build_variable_dict(self):
+        """ Qubits are assigned in task and time order, so the layout doesn't depend on set ordering """
+        for task in self.tasks:
+            for t in range(self.max_time):
+                label = get_label(task, t)
+                if label in self.absurd_times:
+                    continue
+                self.H_pos_by_label[label] = self.H.variable(label)
+                self.H_label_by_pos[len(self.H_label_by_pos)] = label
+        self.n = len(self.H_pos_by_label)
+
+    def build(self, lagrange_one_hot=1, lagrange_precedence=1, lagrange_share=1):
+        """ Accumulates all penalty terms, it's done only once """
+        if self._built:
+            return
+        self._remove_absurd_times({}, {}, [])
+        self._build_variable_dict()
+        self._add_one_start_constraint(lagrange_one_hot)
+        self._add_precedence_constraint(lagrange_precedence)
+        self._add_share_machine_constraint(lagrange_share)
+        self._add_objective()
+        self._built = True
+
+    def get_expression(self, optimization=False) -> QuadraticExpression:
+        """ Returns expression with all quadratic terms, exact onehot constraints are not included """
+        if not optimization:
+            return self.H
+        expression = self.H.copy()
+        for positions in self._objective:
+            expression.add_linear(positions, 1)
+        return expression
+
+    def _exact_onehot_hamiltonian(self):
+        return exact_onehot_hamiltonian(self.onehot_groups, self.n)
+
+    def to_hamiltonian(self, optimization=False) -> SparsePauliOp:
+        hamiltonian = self.get_expression(optimization).to_hamiltonian()
+        if self.onehot == 'exact':
+            hamiltonian = (hamiltonian + self._exact_onehot_hamiltonian()).simplify()
+        return hamiltonian
+
+    def _check_quadratic(self):
+        if self.onehot != 'quadratic':
+            raise ValueError(f'{self.onehot} onehot constraint cannot be written as QUBO, use quadratic onehot')
+
+    def to_qubo(self, optimization=False) -> tuple[np.ndarray, float]:
+        """ Returns upper triangular QUBO matrix and offset """
+        self._check_quadratic()
+        return self.get_expression(optimization).to_qubo()
+
+    def to_bqm(self, optimization=False) -> dimod.BinaryQuadraticModel:
+        """ Returns binary BQM with variables labeled as in H_pos_by_label """
+        self._check_quadratic()
+        return self.get_expression(optimization).to_bqm()
+
+    def get_hamiltonian(self):
+        self.build()
+        return (self.to_hamiltonian(), self.to_hamiltonian(optimization=True),
+                self.H_pos_by_label.copy(), self.H_label_by_pos.copy())
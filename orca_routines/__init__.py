@@ -5,5 +5,6 @@
 The Quantum Launcher version made for Orca
 """
 from .algorithms import BBS
-from .backend import OrcaBackend, PCSSOrcaBackend
+from .backend import LocalOrcaBackend, OrcaBackend, PCSSOrcaBackend
+from .local_solver import LocalBinarySolver
 from .basic_problems import *
@@ -1,10 +1,9 @@
 """ file with orca algorithms subclasses """
 from typing import List
-from ptseries.algorithms.binary_solvers import BinaryBosonicSolver
-from ptseries.common.logger import Logger
 
 from templates import Problem, Algorithm
-from .backend import OrcaBackend
+from .backend import LocalOrcaBackend, OrcaBackend
+from .local_solver import LocalBinarySolver
 from .orca_templates import OrcaRoutine
 
 
@@ -21,7 +20,7 @@ class BBS(Algorithm, OrcaRoutine):
     - updates (int): The number of updates to perform during training.
     - tbi_loops (str): The type of TBI loops to use.
     - print_frequency (int): The frequency at which to print updates.
-    - logger (Logger): The logger object for logging algorithm information.
+    - logger (Logger): The ptseries logger for logging algorithm information, created by the first run on ptseries.
 
     Methods:
     - __init__(self, learning_rate:float=1e-1, updates:int=80, tbi_loops:str='single-loop', print_frequency:int=20) -> None:
@@ -50,7 +49,7 @@ class BBS(Algorithm, OrcaRoutine):
         self.updates = updates
         self.tbi_loops = tbi_loops
         self.print_frequency = print_frequency
-        self.logger = Logger(log_dir=None)
+        self.logger = None
         self.gradient_mode = gradient_mode
         self.n_samples = n_samples
         self.input_state = input_state
@@ -79,16 +78,30 @@ class BBS(Algorithm, OrcaRoutine):
         if backend is not None:
             params.update(backend.get_args())
         qubo_fn_fact, Q = problem.get_orca_qubo()
-        if self.input_state is None:
-            self.input_state = [not i % 2 for i in range(len(Q))]
-        self.bbs = BinaryBosonicSolver(
-            pb_dim=len(Q),
-            objective=Q,
-            gradient_mode=self.gradient_mode,
-            tbi_params=params,
-            n_samples=self.n_samples,
-            input_state=self.input_state
-        )
+        if isinstance(backend, LocalOrcaBackend):
+            self.bbs = LocalBinarySolver(
+                pb_dim=len(Q),
+                objective=problem.get_batch_objective(),
+                gradient_mode=self.gradient_mode,
+                n_samples=self.n_samples,
+                seed=backend.seed
+            )
+        else:
+            # ptseries is imported only here, so the local stand-in works without it
+            from ptseries.algorithms.binary_solvers import BinaryBosonicSolver
+            from ptseries.common.logger import Logger
+            if self.logger is None:
+                self.logger = Logger(log_dir=None)
+            if self.input_state is None:
+                self.input_state = [not i % 2 for i in range(len(Q))]
+            self.bbs = BinaryBosonicSolver(
+                pb_dim=len(Q),
+                objective=Q,
+                gradient_mode=self.gradient_mode,
+                tbi_params=params,
+                n_samples=self.n_samples,
+                input_state=self.input_state
+            )
         self.bbs.train(
             learning_rate=self.learning_rate,
             updates=self.updates,
@@ -14,6 +14,17 @@ class OrcaBackend(Backend, OrcaRoutine):
         return {}
 
 
+class LocalOrcaBackend(OrcaBackend):
+    """
+    Classical stand-in of the PT-Series simulator, BBS trains `LocalBinarySolver` on the batched
+    objective of the problem instead of the bosonic sampler.
+    """
+
+    def __init__(self, name: str = 'local_standin', seed: int | None = None) -> None:
+        super().__init__(name)
+        self.seed = seed
+
+
 class PCSSOrcaBackend(Backend, OrcaRoutine):
     """ Orca QPU backend """
 
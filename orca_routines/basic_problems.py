@@ -1,11 +1,10 @@
 """ Basic problems for Orca """
 from qiskit_routines.basic_problems import QATMQiskit
 import numpy as np
-from qiskit_optimization.converters import QuadraticProgramToQubo
-from qiskit_optimization.translators import from_ising
 from typing import Tuple
 from jssp.pyqubo_scheduler import get_jss_bqm
 from problems import MaxCut, EC, JSSP, Problem, Raw
+from utils import hamiltonian_to_qubo
 from .orca_templates import OrcaRoutine
 
 
@@ -19,25 +18,32 @@ class MaxCutOrca(MaxCut, OrcaRoutine):
     @Problem.output
     def get_orca_qubo(self):
         """ Returns Qubo function """
-        Q = np.zeros((6, 6))
-        for (i, j) in self.instance.edges:
-            Q[i, i] += -1
-            Q[j, j] += -1
-            Q[i, j] += 1
-            Q[j, i] += 1
-
-        return self.get_qubo_fn, Q
+        qubo, _ = self.get_qubo_matrix(symmetric=True)
+        return self.get_qubo_fn, qubo.toarray()
 
 
 class ECOrca(EC, OrcaRoutine):
     gamma = 1
     delta = 0.05
+    ENCODING_PARAMETERS = EC.ENCODING_PARAMETERS + ('gamma', 'delta')
 
     def qubo_fn_fact(self, Q):
         def qubo_fn(bin_vec):
             return np.dot(bin_vec, np.dot(Q, bin_vec)) + self.gamma * (self.num_elements - np.sum(np.array(self.len_routes) * np.array(bin_vec)))**2 - self.delta * np.sum(bin_vec)
         return qubo_fn
 
+    def batch_qubo_fn_fact(self, Q):
+        qubo_fn = super().batch_qubo_fn_fact(Q)
+        incidence, elements = self.get_incidence_matrix()
+        num_elements = len(elements)
+        len_routes = np.asarray(incidence.sum(axis=1)).ravel()
+
+        def batch_qubo_fn(bin_vecs):
+            bin_vecs = np.atleast_2d(bin_vecs)
+            return qubo_fn(bin_vecs) + self.gamma * (num_elements - bin_vecs @ len_routes) ** 2 \
+                - self.delta * bin_vecs.sum(axis=1)
+        return batch_qubo_fn
+
     def Jrr(self, route1, route2):
         s = len(set(route1).intersection(set(route2)))
         return s / 2
@@ -80,17 +86,13 @@ class ECOrca(EC, OrcaRoutine):
 
     @Problem.output
     def get_orca_qubo(self):
-        self.num_elements = self.calculate_num_elements()
-        self.len_routes = self.calculate_lengths_tab()
-        Q = np.zeros((len(self.instance), len(self.instance)))
-        self.Jrr_dict, self.hr_dict = self.calculate_jrr_hr()
-        for i in self.Jrr_dict:
-            Q[i[0]][i[1]] = self.Jrr_dict[i]
-            Q[i[1]][i[0]] = Q[i[0]][i[1]]
-
-        for i in self.hr_dict:
-            Q[i][i] = -self.hr_dict[i]
-
+        # Jrr are halves of route overlaps A @ A.T and hr halves of their row sums minus twice the route lengths
+        incidence, elements = self.get_incidence_matrix()
+        self.num_elements = len(elements)
+        self.len_routes = np.asarray(incidence.sum(axis=1)).ravel().astype(int).tolist()
+        overlaps = (incidence @ incidence.T).toarray()
+        Q = overlaps / 2
+        np.fill_diagonal(Q, -(overlaps.sum(axis=1) - 2 * np.array(self.len_routes)) / 2)
         return self.qubo_fn_fact, Q
 
 
@@ -99,6 +101,8 @@ class JSSPOrca(JSSP, OrcaRoutine):
     lagrange_one_hot = 1
     lagrange_precedence = 2
     lagrange_share = 5
+    ENCODING_PARAMETERS = JSSP.ENCODING_PARAMETERS + ('gamma', 'lagrange_one_hot', 'lagrange_precedence',
+                                                      'lagrange_share')
 
     def _fix_get_jss_bqm(self, instance, max_time, config,
                          lagrange_one_hot=0,
@@ -141,6 +145,15 @@ class JSSPOrca(JSSP, OrcaRoutine):
             return np.dot(bin_vec, np.dot(Q, bin_vec)) + self.gamma * (np.sum(bin_vec) - self.get_len_all_jobs()) ** 2
         return qubo_fn
 
+    def batch_qubo_fn_fact(self, Q):
+        qubo_fn = super().batch_qubo_fn_fact(Q)
+        len_all_jobs = self.get_len_all_jobs()
+
+        def batch_qubo_fn(bin_vecs):
+            bin_vecs = np.atleast_2d(bin_vecs)
+            return qubo_fn(bin_vecs) + self.gamma * (bin_vecs.sum(axis=1) - len_all_jobs) ** 2
+        return batch_qubo_fn
+
     @Problem.output
     def get_orca_qubo(self):
         # Define the matrix Q used for QUBO
@@ -172,11 +185,8 @@ class JSSPOrca(JSSP, OrcaRoutine):
 class QATMOrca(OrcaRoutine, QATMQiskit):
     @Problem.output
     def get_orca_qubo(self):
-        hamiltonian = self.get_qiskit_hamiltonian()
-        qp = from_ising(hamiltonian)
-        conv = QuadraticProgramToQubo()
-        qubo = conv.convert(qp).objective
-        return None, qubo.quadratic.to_array()
+        qubo, _ = hamiltonian_to_qubo(self.get_qiskit_hamiltonian())
+        return None, qubo
 
 
 class RawOrca(Raw, OrcaRoutine):
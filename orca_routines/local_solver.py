@@ -0,0 +1,69 @@
+""" Classical stand-in of the PT-Series binary solver scoring whole batches of samples """
+from typing import Callable
+
+import numpy as np
+
+
+class LocalBinarySolver:
+    """
+    Trains a product distribution over bitstrings with the batched objective of the problem.
+
+    Every bit is sampled independently with probability sin^2(theta_i), so the expectation of the objective is linear
+    in every probability and its exact gradient is given by the parameter shift rule with shifts of pi/4. All samples
+    needed for one update (2 * n_samples for 'spsa', 2 * pb_dim * n_samples for 'paramshift') are drawn from common
+    random numbers and scored with a single call of the objective, which maps an (n_samples x pb_dim) matrix of
+    bits to a vector of values. It follows the interface of `BinaryBosonicSolver` used by BBS.
+
+    Attributes:
+        pb_dim (int): Number of binary variables.
+        objective (Callable[[np.ndarray], np.ndarray]): Batched objective to minimize.
+        gradient_mode (str): 'spsa' or 'paramshift'.
+        n_samples (int): Number of samples used to estimate expectation values.
+        theta (np.ndarray): Parameters of the distribution.
+        E_min_encountered (float): Lowest value of the objective encountered during training.
+        config_min_encountered (list[float]): Bitstring with the lowest value of the objective.
+        losses (list[float]): Estimated expectation of the objective every `log_frequency` updates.
+    """
+    SPSA_PERTURBATION = 0.1
+
+    def __init__(self, pb_dim: int, objective: Callable[[np.ndarray], np.ndarray], gradient_mode: str = 'spsa',
+                 n_samples: int = 20, seed: int | None = None) -> None:
+        if gradient_mode not in ('spsa', 'paramshift'):
+            raise ValueError(f"Unknown gradient mode {gradient_mode}, choose 'spsa' or 'paramshift'")
+        self.pb_dim = pb_dim
+        self.objective = objective
+        self.gradient_mode = gradient_mode
+        self.n_samples = n_samples
+        self.rng = np.random.default_rng(seed)
+        self.theta = np.full(pb_dim, np.pi / 4)
+        self.E_min_encountered = np.inf
+        self.config_min_encountered = None
+        self.losses = []
+
+    def _evaluate(self, thetas: np.ndarray) -> np.ndarray:
+        """ Returns mean objective of every row of thetas, keeps track of the best sample """
+        uniforms = self.rng.random((self.n_samples, self.pb_dim))
+        samples = (uniforms < np.sin(thetas[:, None, :]) ** 2).reshape(-1, self.pb_dim).astype(float)
+        energies = np.asarray(self.objective(samples), dtype=float)
+        best = int(np.argmin(energies))
+        if energies[best] < self.E_min_encountered:
+            self.E_min_encountered = float(energies[best])
+            self.config_min_encountered = samples[best].tolist()
+        return energies.reshape(len(thetas), self.n_samples).mean(axis=1)
+
+    def _gradient(self) -> tuple[np.ndarray, float]:
+        if self.gradient_mode == 'spsa':
+            delta = self.rng.choice([-1.0, 1.0], self.pb_dim)
+            shift = self.SPSA_PERTURBATION * delta
+            plus, minus = self._evaluate(np.stack([self.theta + shift, self.theta - shift]))
+            return (plus - minus) / (2 * shift), (plus + minus) / 2
+        shifts = np.pi / 4 * np.eye(self.pb_dim)
+        means = self._evaluate(np.concatenate([self.theta + shifts, self.theta - shifts]))
+        return means[:self.pb_dim] - means[self.pb_dim:], means.mean()
+
+    def train(self, learning_rate: float = 1e-1, updates: int = 80, log_frequency: int = 20, logger=None) -> None:
+        for update in range(updates):
+            gradient, loss = self._gradient()
+            self.theta = np.clip(self.theta - learning_rate * gradient, 0, np.pi / 2)
+            if log_frequency and update % log_frequency == 0:
+                self.losses.append(float(loss))
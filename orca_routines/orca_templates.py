@@ -1,4 +1,5 @@
 """ Templates for Orca """
+import numpy as np
 
 
 class OrcaRoutine:
@@ -7,3 +8,17 @@ class OrcaRoutine:
     @property
     def ROUTINE_CLASS(self):
         return OrcaRoutine
+
+    def batch_qubo_fn_fact(self, Q):
+        """ Returns the objective scoring a (n_samples x n) matrix of bitstrings at once, the QUBO by default """
+        Q = np.asarray(Q, dtype=float)
+
+        def batch_qubo_fn(bin_vecs):
+            bin_vecs = np.atleast_2d(bin_vecs)
+            return np.einsum('ij,jk,ik->i', bin_vecs, Q, bin_vecs)
+        return batch_qubo_fn
+
+    def get_batch_objective(self):
+        """ Returns the batched counterpart of the QUBO function of `get_orca_qubo` """
+        _, Q = self.get_orca_qubo()
+        return self.batch_qubo_fn_fact(Q)
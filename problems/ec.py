@@ -1,6 +1,9 @@
 """  This module contains the EC class."""
 import ast
 
+import numpy as np
+from scipy.sparse import csr_matrix, diags, triu
+
 from templates import Problem
 
 
@@ -21,8 +24,11 @@ class EC(Problem):
     Methods:
         set_instance: Sets the instance of the problem.
         read_instance: Reads the instance from a file.
+        get_incidence_matrix: Returns the sparse route x element incidence matrix.
+        get_qubo_matrix: Returns the sparse quadratic exact cover QUBO shared by the routines.
 
     """
+    ENCODING_PARAMETERS = ('onehot',)
 
     def __init__(self, onehot: str, instance: any = None,
                  instance_name: str | None = None, instance_path: str = None) -> None:
@@ -55,6 +61,41 @@ class EC(Problem):
                                      {2, 3, 6, 7},
                                      {2, 7}]
 
+    def get_incidence_matrix(self) -> tuple[csr_matrix, list]:
+        """
+        Builds the 0/1 matrix with a row for every route (subset) and a column for every element in one pass.
+
+        Returns:
+            tuple[csr_matrix, list]: Incidence matrix and elements of its columns in order of first appearance.
+        """
+        columns = {}
+        cols = [columns.setdefault(element, len(columns)) for route in self.instance for element in route]
+        rows = np.repeat(np.arange(len(self.instance)), [len(route) for route in self.instance])
+        incidence = csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(self.instance), len(columns)))
+        return incidence, list(columns)
+
+    def get_qubo_matrix(self, symmetric: bool = False) -> tuple[csr_matrix, float]:
+        """
+        Builds the QUBO of sum over elements of (number of chosen routes covering the element - 1)^2.
+
+        Overlaps of routes are the entries of A @ A.T for the incidence matrix A, the linear terms are minus the
+        lengths of routes (row sums of A). With the returned offset the QUBO is zero exactly at exact covers.
+
+        Args:
+            symmetric (bool, optional): If True, couplings are split between both triangles, otherwise the matrix
+                is upper triangular. Defaults to False.
+
+        Returns:
+            tuple[csr_matrix, float]: QUBO matrix and offset.
+        """
+        incidence, elements = self.get_incidence_matrix()
+        overlaps = (incidence @ incidence.T).tocsr()
+        lengths = np.asarray(incidence.sum(axis=1)).ravel()
+        couplings = overlaps - diags(overlaps.diagonal())
+        if not symmetric:
+            couplings = 2 * triu(couplings, k=1)
+        return csr_matrix(diags(-lengths) + couplings), float(len(elements))
+
     def read_instance(self, instance_path: str):
         with open(instance_path, 'r', encoding='utf-8') as file:
             read_file = file.read()
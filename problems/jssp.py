@@ -1,7 +1,7 @@
 """  Module for Job Shop Scheduling Problem (JSSP)."""
 from collections import defaultdict
 
-from jssp.qiskit_scheduler import get_jss_hamiltonian
+from jssp.qiskit_scheduler import get_jss_hamiltonian_variant, get_jss_label_by_pos, get_jss_pos_by_label
 from templates import Problem
 
 
@@ -20,12 +20,18 @@ class JSSP(Problem):
         onehot (str): The one-hot encoding method to be used.
         optimization_problem (bool): Flag indicating whether the problem is an optimization problem or a decision problem.
         results (dict): Dictionary to store the results of the problem instance.
+        h_pos_by_label (dict): Qubit index by label, shared between problems with the same instance.
+        h_label_by_pos (dict): Label by qubit index, shared between problems with the same instance.
+        h_d (SparsePauliOp): Decision Hamiltonian, built on first access.
+        h_o (SparsePauliOp): Optimization Hamiltonian, built on first access.
 
     Methods:
         set_instance: Sets the problem instance manually.
         read_instance: Reads the problem instance from a file.
 
     """
+    ENCODING_PARAMETERS = ('max_time', 'onehot', 'optimization_problem')
+
     def __init__(self, max_time: int, onehot: str, instance: any = None,
                  instance_name: str | None = None, instance_path: str | None = None,
                  optimization_problem: bool = False) -> None:
@@ -35,16 +41,31 @@ class JSSP(Problem):
         self.onehot = onehot
         self.optimization_problem = optimization_problem
 
-        self.h_d, self.h_o, self.h_pos_by_label, self.h_label_by_pos = get_jss_hamiltonian(self.instance, max_time,
-                                                                                           onehot)
+        self.variant = 'optimization' if optimization_problem else 'decision'
+
+    @property
+    def h_d(self):
+        return get_jss_hamiltonian_variant(self.instance, self.max_time, self.onehot, optimization=False)
 
-        self.results = {'instance_name': instance_name,
-                        'max_time': max_time,
-                        'onehot': onehot,
-                        'H_pos_by_label': self.h_pos_by_label,
-                        'H_label_by_pos': self.h_label_by_pos}
+    @property
+    def h_o(self):
+        return get_jss_hamiltonian_variant(self.instance, self.max_time, self.onehot, optimization=True)
 
-        self.variant = 'optimization' if optimization_problem else 'decision'
+    @property
+    def h_pos_by_label(self) -> dict:
+        return get_jss_pos_by_label(self.instance, self.max_time, self.onehot)
+
+    @property
+    def h_label_by_pos(self) -> dict:
+        return get_jss_label_by_pos(self.instance, self.max_time, self.onehot)
+
+    @property
+    def results(self) -> dict:
+        return {'instance_name': self.instance_name,
+                'max_time': self.max_time,
+                'onehot': self.onehot,
+                'H_pos_by_label': self.h_pos_by_label,
+                'H_label_by_pos': self.h_label_by_pos}
 
     @property
     def setup(self) -> dict:
@@ -1,5 +1,7 @@
 """  This module contains the MaxCut class."""
 import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix, diags, triu
 
 from templates import Problem
 
@@ -20,6 +22,7 @@ class MaxCut(Problem):
     Methods:
         set_instance: Sets the instance of the problem.
         read_instance: Reads the instance from a file.
+        get_qubo_matrix: Returns the sparse QUBO shared by the routines.
     """
 
     def __init__(self, instance: nx.Graph | None = None, instance_name: str | None = None,
@@ -43,6 +46,26 @@ class MaxCut(Problem):
                                  (2, 4), (2, 5), (3, 4), (3, 5)]
                     self.instance.add_edges_from(edge_list)
 
+    def get_qubo_matrix(self, symmetric: bool = False) -> tuple[csr_matrix, float]:
+        """
+        Builds the QUBO of the instance from its sparse adjacency matrix and degree vector.
+
+        Nodes have to be labeled 0, ..., n - 1. With the returned offset the QUBO counts the uncut edges.
+
+        Args:
+            symmetric (bool, optional): If True, couplings are split between both triangles, otherwise the matrix
+                is upper triangular. Defaults to False.
+
+        Returns:
+            tuple[csr_matrix, float]: QUBO matrix and offset.
+        """
+        n = self.instance.number_of_nodes()
+        adjacency = nx.to_scipy_sparse_array(self.instance, nodelist=range(n), dtype=float, weight=None,
+                                             format='csr')
+        degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+        couplings = adjacency if symmetric else 2 * triu(adjacency, k=1)
+        return csr_matrix(diags(-degrees) + couplings), float(self.instance.number_of_edges())
+
     def _get_path(self) -> str:
         return f'{self.name}@{self.instance_name}'
 
@@ -57,6 +80,6 @@ class MaxCut(Problem):
         plt.show()
 
     @staticmethod
-    def generate_maxcut_instance(num_vertices, edge_probability):
-        G = nx.gnp_random_graph(num_vertices, edge_probability)
+    def generate_maxcut_instance(num_vertices, edge_probability, seed=None):
+        G = nx.gnp_random_graph(num_vertices, edge_probability, seed=seed)
         return G
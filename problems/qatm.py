@@ -3,6 +3,7 @@ import os
 
 import numpy as np
 import pandas as pd
+from scipy.sparse import csr_matrix, diags, triu
 
 from templates import Problem
 
@@ -26,7 +27,10 @@ class QATM(Problem):
         set_instance: Sets the instance of the problem.
         read_instance: Reads the instance from a file.
         analyze_result: Analyzes the result in terms of collisions and violations of onehot constraint.
+        get_onehot_groups: Returns indices of manouvers of every aircraft.
+        get_qubo_matrix: Returns the sparse QUBO of conflicts, goal and quadratic onehot penalties.
     """
+    ENCODING_PARAMETERS = ('onehot', 'optimization_problem')
 
     def __init__(self, onehot: str, instance: any = None, instance_name: str | None = None,
                  instance_path: str | None = None,
@@ -55,6 +59,42 @@ class QATM(Problem):
         self.instance = {'cm': np.loadtxt(cm_path),
                          'aircrafts': pd.read_csv(aircrafts_path, delimiter=' ', names=['manouver', 'aircraft'])}
 
+    def get_onehot_groups(self) -> list[np.ndarray]:
+        """ Returns positions of manouvers of every aircraft (in order of positions), from a single factorize """
+        codes, _ = pd.factorize(self.instance['aircrafts']['aircraft'], sort=True)
+        order = np.argsort(codes, kind='stable')
+        return np.split(order, np.cumsum(np.bincount(codes))[:-1])
+
+    def get_qubo_matrix(self, onehot: bool = True) -> tuple[csr_matrix, float]:
+        """
+        Builds the upper triangular QUBO of the instance with array operations.
+
+        Couplings of conflicting manouvers come from the upper triangle of `cm`. If `optimization_problem` is set,
+        every changed manouver costs 1 / sum(cm). With `onehot` the quadratic penalty (sum of manouvers - 1)^2
+        of every aircraft is added, couplings between manouvers of the same aircraft are entries of G @ G.T for
+        the manouver x aircraft incidence matrix G.
+
+        Args:
+            onehot (bool, optional): If False, onehot penalties are left out. Defaults to True.
+
+        Returns:
+            tuple[csr_matrix, float]: QUBO matrix and offset.
+        """
+        cm = self.instance['cm']
+        aircrafts = self.instance['aircrafts']
+        n = len(cm)
+        qubo = triu(csr_matrix(cm == 1, dtype=float), k=1)
+        offset = 0.0
+        if self.optimization_problem:
+            changed = (aircrafts['manouver'] != aircrafts['aircraft']).to_numpy(dtype=float)
+            qubo = qubo + diags(changed / cm.sum())
+        if onehot:
+            codes, uniques = pd.factorize(aircrafts['aircraft'])
+            incidence = csr_matrix((np.ones(n), (np.arange(n), codes)), shape=(n, len(uniques)))
+            qubo = qubo + 2 * triu(incidence @ incidence.T, k=1) - diags(np.ones(n))
+            offset += len(uniques)
+        return csr_matrix(qubo), offset
+
     def analyze_result(self, result: dict):
         """
         Analyzes the result in terms of collisions and violations of onehot constraint.
@@ -66,7 +106,7 @@ class QATM(Problem):
             dict: A dictionary containing collisions, onehot violations, and changes as ndarrays.
         """
         keys = list(result.keys())
-        vectorized_result = (np.fromstring("".join(keys), 'u1') - ord('0')).reshape(len(result), -1)
+        vectorized_result = (np.frombuffer(''.join(keys).encode('ascii'), 'u1') - ord('0')).reshape(len(result), -1)
 
         cm = self.instance['cm'].copy().astype(int)
         np.fill_diagonal(cm, 0)
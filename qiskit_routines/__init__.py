@@ -5,5 +5,7 @@
 The Quantum Launcher version for Qiskit-based architecture.
 """
 from .algorithms import QAOA, FALQON
+from .circuit_cache import CircuitCache
+from .parameter_store import QAOAParameterStore
 from .backend import QiskitBackend
 from .basic_problems import *
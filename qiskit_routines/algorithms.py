@@ -1,45 +1,74 @@
 """ Algorithms for Qiskit routines """
+import copy
 import json
+import uuid
 from abc import ABC
 from datetime import datetime
+from time import perf_counter
 
 import numpy as np
 from qiskit import qpy, QuantumCircuit
 from qiskit.circuit import ParameterVector
-from qiskit.circuit.library import PauliEvolutionGate
+from qiskit.circuit.library import PauliEvolutionGate, QAOAAnsatz
 # from qiskit.opflow import H
 from qiskit.primitives.base.base_primitive import BasePrimitive
 from qiskit.quantum_info import SparsePauliOp
+from qiskit.result import QuasiDistribution
 from qiskit_algorithms.minimum_eigensolvers import QAOA as QiskitQAOA
 from qiskit_algorithms.minimum_eigensolvers import SamplingVQEResult
+from qiskit_algorithms.utils import validate_bounds, validate_initial_point
 
 from templates import Problem, Algorithm
+from utils import EnergyEvaluator
 from .backend import QiskitBackend
+from .circuit_cache import DEFAULT_CIRCUIT_CACHE, CircuitCache
+from .diagonal_simulator import DiagonalQAOASimulator
+from .metrics_collector import MetricsCollector
+from .parameter_store import QAOAParameterStore
 from .qiskit_template import QiskitRoutine
+from .timed_sampler import TimedSampler
+
+
+def _aggregate(probabilities: np.ndarray, values: np.ndarray, aggregation=None) -> float:
+    """ Aggregates energies of measured states like SamplingVQE: mean, CVaR for float alpha or a custom callable """
+    if aggregation is None:
+        return float(probabilities @ values)
+    if callable(aggregation):
+        return aggregation(list(zip(probabilities, values)))
+    order = np.argsort(values, kind='stable')
+    probabilities, values = probabilities[order], values[order]
+    weights = np.clip(aggregation - (np.cumsum(probabilities) - probabilities), 0, probabilities)
+    return float(weights @ values / aggregation)
 
 
 class QiskitOptimizationAlgorithm(Algorithm, QiskitRoutine, ABC):
-    """ Abstract class for Qiskit optimization algorithms """
+    """
+    Abstract class for Qiskit optimization algorithms
+
+    Jobs of every run are tagged with a unique tag, their processing times are fetched by `metrics_collector`
+    (shared by all algorithms unless set for an instance).
+    """
+    metrics_collector: MetricsCollector = MetricsCollector()
 
     def make_tag(self, problem: Problem, backend: QiskitBackend) -> str:
         tag = problem.path + '-' + \
             backend.path + '-' + \
             self.path + '-' + \
-            datetime.today().strftime('%Y-%m-%d')
+            datetime.today().strftime('%Y-%m-%d') + '-' + \
+            uuid.uuid4().hex
         return tag
 
+    def submit_processing_times(self, tag: str, primitive: BasePrimitive) -> bool:
+        """ Starts fetching processing times of jobs with the tag in background, returns False for local primitives """
+        if not hasattr(primitive, 'session'):
+            return False
+        self.metrics_collector.submit(tag, primitive.session.service)
+        return True
+
     def get_processing_times(self, tag: str, primitive: BasePrimitive) -> None | tuple[list, list, int]:
-        timestamps = []
-        usages = []
-        qpu_time = 0
-        if hasattr(primitive, 'session'):
-            jobs = primitive.session.service.jobs(limit=None, job_tags=[tag])
-            for job in jobs:
-                m = job.metrics()
-                timestamps.append(m['timestamps'])
-                usages.append(m['usage'])
-                qpu_time += m['usage']['quantum_seconds']
-        return timestamps, usages, qpu_time
+        if not self.submit_processing_times(tag, primitive):
+            return [], [], 0
+        return self.metrics_collector.get(tag)
 
 
 def commutator(op_a: SparsePauliOp, op_b: SparsePauliOp) -> SparsePauliOp:
@@ -54,6 +83,22 @@ class QAOA(QiskitOptimizationAlgorithm):
         p (int): The number of QAOA steps. Defaults to 1.
         alternating_ansatz (bool): Whether to use an alternating ansatz. Defaults to False. If True, it's recommended to provide a mixer_h to alg_kwargs.
         aux: Auxiliary input for the QAOA algorithm.
+        batch_size (int | None): Number of parameter vectors evaluated by the optimizer in one Sampler call,
+            used by optimizers supporting grouped evaluations (e.g. SPSA perturbations). Defaults to None.
+        initial_population (int | np.ndarray | None): Parameter vectors ([betas..., gammas...]) evaluated in one
+            Sampler call before the optimization, e.g. a grid for warm start. An int gives that many random vectors.
+            The best ones are used as initial points. Defaults to None.
+        restarts (int): Number of optimizations started from the best vectors of the initial population,
+            the best result is returned. Defaults to 1.
+        seed (int | None): Seed of the random initial population. Defaults to None.
+        parameter_store (QAOAParameterStore | None): Store of optimized parameters. If given, the initial point
+            (unless given in alg_kwargs) is the stored or interpolated one, and the optimized point is stored back.
+            Defaults to None.
+        circuit_cache (CircuitCache | None): Cache of depth and CX count of the ansatz, shared by default
+            by all runs in the process. Defaults to None.
+        defer_metrics (bool): If True, processing times of runtime jobs are fetched in background and the run doesn't
+            wait for them; 'timestamps', 'usages' and 'qpu_time' are None until filled by
+            `metrics_collector.fill(results)`. Defaults to False.
         **alg_kwargs: Additional keyword arguments for the base class.
 
     Attributes:
@@ -65,9 +110,19 @@ class QAOA(QiskitOptimizationAlgorithm):
         mixer_h (SparsePauliOp | None): The mixer Hamiltonian.
         mixer_h (QuantumCircuit | None): The initial state of the circuit.
 
+    Size and latency of every Sampler call are reported in the 'batches' and 'batches_summary' results.
+
+    With the 'diagonal_simulator' backend the ansatz is simulated by `DiagonalQAOASimulator` instead of the Sampler.
+    The eigenstate of the result keeps the `EIGENSTATE_SIZE` most probable states and the best measurement
+    is the lowest energy one among them. Alternating ansatz, aux operators and aggregation are not supported there.
+
     """
+    EIGENSTATE_SIZE = 1024
 
-    def __init__(self, p: int = 1, alternating_ansatz: bool = False, aux=None, **alg_kwargs):
+    def __init__(self, p: int = 1, alternating_ansatz: bool = False, aux=None, batch_size: int | None = None,
+                 initial_population: int | np.ndarray | None = None, restarts: int = 1, seed: int | None = None,
+                 parameter_store: QAOAParameterStore | None = None, circuit_cache: CircuitCache | None = None,
+                 defer_metrics: bool = False, **alg_kwargs):
         super().__init__(**alg_kwargs)
         self.name: str = 'qaoa'
         self.aux = aux
@@ -76,6 +131,13 @@ class QAOA(QiskitOptimizationAlgorithm):
         self.parameters = ['p']
         self.mixer_h: SparsePauliOp | None = None
         self.initial_state: QuantumCircuit | None = None
+        self.batch_size: int | None = batch_size
+        self.initial_population: int | np.ndarray | None = initial_population
+        self.restarts: int = restarts
+        self.seed: int | None = seed
+        self.parameter_store: QAOAParameterStore | None = parameter_store
+        self.circuit_cache: CircuitCache | None = circuit_cache
+        self.defer_metrics: bool = defer_metrics
 
     @property
     def setup(self) -> dict:
@@ -83,12 +145,34 @@ class QAOA(QiskitOptimizationAlgorithm):
             'aux': self.aux,
             'p': self.p,
             'parameters': self.parameters,
+            'batch_size': self.batch_size,
+            'restarts': self.restarts,
             'arg_kwargs': self.alg_kwargs
         }
 
     def _get_path(self) -> str:
         return f'{self.name}@{self.p}'
 
+    def _get_population(self) -> np.ndarray:
+        if not isinstance(self.initial_population, (int, np.integer)):
+            return np.reshape(np.asarray(self.initial_population, dtype=float), (-1, 2 * self.p))
+        rng = np.random.default_rng(self.seed)
+        betas = rng.uniform(0, np.pi, (self.initial_population, self.p))
+        gammas = rng.uniform(0, 2 * np.pi, (self.initial_population, self.p))
+        return np.hstack([betas, gammas])
+
+    def evaluate_population(self, sampler, hamiltonian: SparsePauliOp, points: np.ndarray) -> np.ndarray:
+        """ Returns energies of the QAOA ansatz for all parameter vectors, evaluated in one Sampler call """
+        ansatz = QAOAAnsatz(hamiltonian, reps=self.p, initial_state=self.initial_state,
+                            mixer_operator=self.mixer_h)
+        ansatz.measure_all()
+        result = sampler.run(len(points) * [ansatz], np.asarray(points).tolist()).result()
+        evaluator = EnergyEvaluator(hamiltonian)
+        aggregation = self.alg_kwargs.get('aggregation')
+        return np.array([_aggregate(np.fromiter(dist.values(), dtype=float),
+                                    evaluator.evaluate_integers(list(dist.keys())), aggregation)
+                         for dist in result.quasi_dists])
+
     def parse_samplingVQEResult(self, res: SamplingVQEResult, res_path) -> dict:
         res_dict = {}
         for k, v in vars(res).items():
@@ -129,9 +213,13 @@ class QAOA(QiskitOptimizationAlgorithm):
             energies.append(mean)
 
         tag = self.make_tag(problem, backend)
-        sampler = backend.sampler
+        sampler = TimedSampler(backend.sampler)
         sampler.set_options(job_tags=[tag])
         optimizer = backend.optimizer
+        if self.batch_size is not None:
+            # the optimizer of the backend is shared by other runs
+            optimizer = copy.copy(optimizer)
+            optimizer.set_max_evals_grouped(self.batch_size)
 
         if self.alternating_ansatz:
             if self.mixer_h is None:
@@ -139,25 +227,102 @@ class QAOA(QiskitOptimizationAlgorithm):
             if self.initial_state is None:
                 self.initial_state = problem.get_QAOAAnsatz_initial_state()
 
-        qaoa = QiskitQAOA(sampler, optimizer, reps=self.p, callback=qaoa_callback,
-                          mixer=self.mixer_h, initial_state=self.initial_state, **self.alg_kwargs)
-        qaoa_result = qaoa.compute_minimum_eigenvalue(hamiltonian, self.aux)
-        depth = qaoa.ansatz.decompose(reps=10).depth()
-        if 'cx' in qaoa.ansatz.decompose(reps=10).count_ops():
-            cx_count = qaoa.ansatz.decompose(reps=10).count_ops()['cx']
+        alg_kwargs = dict(self.alg_kwargs)
+        initial_points = [alg_kwargs.pop('initial_point', None)]
+        if initial_points[0] is None and self.parameter_store is not None:
+            initial_points = [self.parameter_store.initial_point(problem, hamiltonian, self.p)]
+        simulator = None
+        if backend.name == 'diagonal_simulator':
+            if self.alternating_ansatz or self.aux is not None or alg_kwargs.get('aggregation') is not None:
+                raise ValueError('diagonal_simulator supports only the standard ansatz without aux operators '
+                                 'and aggregation')
+            simulator = DiagonalQAOASimulator(hamiltonian, self.p)
+        if self.initial_population is not None:
+            population = self._get_population()
+            if initial_points[0] is not None:
+                population = np.vstack([np.reshape(initial_points[0], (1, -1)), population])
+            if simulator is None:
+                population_energies = self.evaluate_population(sampler, hamiltonian, population)
+            else:
+                population_energies = simulator.expectation(population)
+            initial_points = population[np.argsort(population_energies)[:max(self.restarts, 1)]]
+
+        if simulator is not None:
+            qaoa_result, ansatz = self._run_diagonal(simulator, hamiltonian, optimizer, initial_points, energies)
         else:
-            cx_count = 0
-        timestamps, usages, qpu_time = self.get_processing_times(tag, sampler)
+            qaoa_result = None
+            for initial_point in initial_points:
+                qaoa = QiskitQAOA(sampler, optimizer, reps=self.p, callback=qaoa_callback, mixer=self.mixer_h,
+                                  initial_state=self.initial_state, initial_point=initial_point, **alg_kwargs)
+                start_result = qaoa.compute_minimum_eigenvalue(hamiltonian, self.aux)
+                if qaoa_result is None or start_result.eigenvalue < qaoa_result.eigenvalue:
+                    qaoa_result = start_result
+            ansatz = qaoa.ansatz
+        if self.parameter_store is not None:
+            self.parameter_store.update(problem, hamiltonian, self.p, qaoa_result.optimal_point, qaoa_result.eigenvalue)
+        circuit_cache = DEFAULT_CIRCUIT_CACHE if self.circuit_cache is None else self.circuit_cache
+        metrics = circuit_cache.metrics(CircuitCache.key(hamiltonian, self.p, self.mixer_h, self.initial_state), ansatz)
+        if self.defer_metrics and self.submit_processing_times(tag, sampler):
+            timestamps, usages, qpu_time = None, None, None
+        else:
+            timestamps, usages, qpu_time = self.get_processing_times(tag, sampler)
         result = {'energy': qaoa_result.eigenvalue,
-                  'depth': depth,
-                  'cx_count': cx_count,
+                  'depth': metrics['depth'],
+                  'cx_count': metrics['cx_count'],
                   'qpu_time': qpu_time,
                   'energies': energies,
                   'SamplingVQEResult': qaoa_result,
                   'usages': usages,
-                  'timestamps': timestamps}
+                  'timestamps': timestamps,
+                  'metrics_tag': tag,
+                  'batches': sampler.batches,
+                  'batches_summary': sampler.summary()}
         return result
 
+    def _run_diagonal(self, simulator: DiagonalQAOASimulator, hamiltonian: SparsePauliOp, optimizer,
+                      initial_points: list, energies: list) -> tuple[SamplingVQEResult, QuantumCircuit]:
+        """ Optimizes the ansatz simulated by `DiagonalQAOASimulator`, returns result like Qiskit's QAOA """
+        ansatz = QAOAAnsatz(hamiltonian, reps=self.p)
+        evaluations = 0
+
+        def evaluate_energy(parameters):
+            nonlocal evaluations
+            values = simulator.expectation(parameters)
+            evaluations += np.size(values)
+            energies.extend(np.atleast_1d(values).tolist())
+            return values
+
+        bounds = validate_bounds(ansatz)
+        optimizer_result = None
+        start = perf_counter()
+        for initial_point in initial_points:
+            initial_point = validate_initial_point(initial_point, ansatz)
+            start_result = optimizer.minimize(fun=evaluate_energy, x0=initial_point, bounds=bounds)
+            if optimizer_result is None or start_result.fun < optimizer_result.fun:
+                optimizer_result = start_result
+        optimizer_time = perf_counter() - start
+
+        probabilities = simulator.probabilities(optimizer_result.x)
+        size = min(self.EIGENSTATE_SIZE, len(probabilities))
+        states = np.argpartition(probabilities, -size)[-size:]
+        best_state = int(states[np.argmin(simulator.cost[states])])
+
+        result = SamplingVQEResult()
+        result.eigenvalue = simulator.expectation(optimizer_result.x)
+        result.eigenstate = QuasiDistribution({int(state): float(probabilities[state]) for state in states})
+        result.best_measurement = {'state': best_state,
+                                   'bitstring': format(best_state, f'0{hamiltonian.num_qubits}b'),
+                                   'value': simulator.cost[best_state],
+                                   'probability': float(probabilities[best_state])}
+        result.optimal_point = optimizer_result.x
+        result.optimal_parameters = dict(zip(ansatz.parameters, optimizer_result.x))
+        result.optimal_value = optimizer_result.fun
+        result.cost_function_evals = evaluations
+        result.optimizer_time = optimizer_time
+        result.optimizer_result = optimizer_result
+        result.optimal_circuit = ansatz
+        return result, ansatz
+
     def get_bitstring(self, result) -> str:
         return result['SamplingVQEResult'].best_measurement['bitstring']
 
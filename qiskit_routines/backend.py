@@ -1,13 +1,14 @@
 """ Backend Class for Qiskit Launcher """
 from qiskit.primitives import Estimator as LocalEstimator, BaseEstimator
 from qiskit.primitives import Sampler as LocalSampler, BaseSampler
-from qiskit.primitives import BackendSampler, BackendEstimator
+from qiskit.primitives import BackendEstimator
 from qiskit.providers import BackendV1, BackendV2
 from qiskit_algorithms.optimizers import COBYLA, SPSA, SciPyOptimizer, Optimizer
 from qiskit_ibm_runtime import Estimator, Sampler
 from qiskit_ibm_runtime import Session, Options
 
 from templates import Backend
+from .circuit_cache import CachedBackendSampler, CircuitCache
 from .qiskit_template import QiskitRoutine
 
 
@@ -26,17 +27,24 @@ class QiskitBackend(Backend, QiskitRoutine):
         sampler (BaseSampler): The sampler used for sampling.
         estimator (BaseEstimator): The estimator used for estimation.
         optimizer (Optimizer): The optimizer used for optimization.
+        circuit_cache (CircuitCache | None): Cache of transpiled circuits used by the 'backendv1v2_simulator' sampler,
+            the process wide one by default.
+
+    Backend names: 'local_simulator', 'diagonal_simulator' (local statevector simulation of QAOA for
+    Hamiltonians diagonal in Z, other algorithms use local primitives), 'backendv1v2_simulator', or a runtime backend.
 
     Methods:
         setup() -> dict: Returns a dictionary with the setup information of the backend.
         _set_primitives_on_backend_name() -> None: Sets the appropriate primitives based on the backend name.
     """
     
-    def __init__(self, name: str, session: Session = None, options: Options = None, backendv1v2: BackendV1 | BackendV2 = None) -> None:
+    def __init__(self, name: str, session: Session = None, options: Options = None, backendv1v2: BackendV1 | BackendV2 = None,
+                 circuit_cache: CircuitCache | None = None) -> None:
         super().__init__(name)
         self.session = session
         self.options = options
         self.backendv1v2 = backendv1v2
+        self.circuit_cache = circuit_cache
         self.primitive_strategy = None
         self.sampler = None
         self.estimator: BaseEstimator = None
@@ -51,13 +59,13 @@ class QiskitBackend(Backend, QiskitRoutine):
         }
 
     def _set_primitives_on_backend_name(self) -> None:
-        if self.name == 'local_simulator':
+        if self.name in ('local_simulator', 'diagonal_simulator'):
             self.estimator = LocalEstimator(options=self.options)
             self.sampler = LocalSampler(options=self.options)
             self.optimizer = COBYLA()
         elif self.name == 'backendv1v2_simulator':
             self.estimator = BackendEstimator(backend=self.backendv1v2)
-            self.sampler = BackendSampler(backend=self.backendv1v2)
+            self.sampler = CachedBackendSampler(self.backendv1v2, self.circuit_cache)
             self.optimizer = COBYLA()
         elif self.session is None:
             raise AttributeError('Please instantiate a session if using other backend than local')
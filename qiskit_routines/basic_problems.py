@@ -1,9 +1,9 @@
 # from .launcher import QiskitProblem
-import hampy
 import numpy as np
-from qiskit.quantum_info import SparsePauliOp
+from qiskit.quantum_info import PauliList, SparsePauliOp
 from qiskit import QuantumCircuit
 import problems
+from utils import exact_onehot_hamiltonian, qubo_to_hamiltonian
 from .qiskit_template import QiskitRoutine
 
 
@@ -31,27 +31,12 @@ class ECQiskit(problems.EC, QiskitRoutine):
     @problems.Problem.output
     def get_qiskit_hamiltonian(self) -> SparsePauliOp:
         """ generating hamiltonian"""
-        elements = set().union(*self.instance)
-        onehots = []
-        for ele in elements:
-            ohs = set()
-            for i, subset in enumerate(self.instance):
-                if ele in subset:
-                    ohs.add(i)
-            onehots.append(ohs)
-        hamiltonian = None
-        for ohs in onehots:
-            if self.onehot == 'exact':
-                part = hampy.Ham_not(hampy.H_one_in_n(
-                    list(ohs), size=len(self.instance)))
-            elif self.onehot == 'quadratic':
-                part = hampy.quadratic_onehot(list(ohs), len(self.instance))
-
-            if hamiltonian is None:
-                hamiltonian = part
-            else:
-                hamiltonian += part
-        return hamiltonian.simplify()
+        if self.onehot == 'quadratic':
+            return qubo_to_hamiltonian(*self.get_qubo_matrix())
+        # columns of the incidence matrix are the routes covering every element
+        incidence = self.get_incidence_matrix()[0].tocsc()
+        onehots = np.split(incidence.indices, incidence.indptr[1:-1])
+        return exact_onehot_hamiltonian(onehots, len(self.instance))
 
     def get_mixer_hamiltonian(self, amount_of_rings=None):
         """ generates mixer hamiltonian """
@@ -145,69 +130,34 @@ class JSSPQiskit(problems.JSSP, QiskitRoutine):
 class MaxCutQiskit(problems.MaxCut, QiskitRoutine):
     @problems.Problem.output
     def get_qiskit_hamiltonian(self):
-        ham = None
-        n = self.instance.number_of_nodes()
-        for edge in self.instance.edges():
-            if ham is None:
-                ham = hampy.Ham_not(hampy.H_one_in_n(edge, n))
-            else:
-                ham += hampy.Ham_not(hampy.H_one_in_n(edge, n))
-        return ham.simplify()
+        return qubo_to_hamiltonian(*self.get_qubo_matrix())
 
 
 class QATMQiskit(problems.QATM, QiskitRoutine):
     @problems.Problem.output
     def get_qiskit_hamiltonian(self) -> SparsePauliOp:
-        cm = self.instance['cm']
-        aircrafts = self.instance['aircrafts']
-
-        onehot_hamiltonian = None
-        for plane, manouvers in aircrafts.groupby(by='aircraft'):
-            if self.onehot == 'exact':
-                h = hampy.Ham_not(hampy.H_one_in_n(
-                    manouvers.index.values.tolist(), len(cm)))
-            elif self.onehot == 'quadratic':
-                h = hampy.quadratic_onehot(
-                    manouvers.index.values.tolist(), len(cm))
-            elif self.onehot == 'xor':
-                h = hampy.Ham_not(hampy.H_xor(
-                    manouvers.index.values.tolist(), len(cm)))
-            if onehot_hamiltonian is not None:
-                onehot_hamiltonian += h
-            else:
-                onehot_hamiltonian = h
-
-        triu = np.triu(cm, k=1)
-        conflict_hamiltonian = None
-        for p1, p2 in zip(*np.where(triu == 1)):
-            if conflict_hamiltonian is not None:
-                conflict_hamiltonian += hampy.H_and([p1, p2], len(cm))
-            else:
-                conflict_hamiltonian = hampy.H_and([p1, p2], len(cm))
-
-        hamiltonian = onehot_hamiltonian + conflict_hamiltonian
-
-        if self.optimization_problem:
-            goal_hamiltonian = None
-            for i, (maneuver, ac) in self.instance['aircrafts'].iterrows():
-                if maneuver != ac:
-                    h = hampy.H_x(i, len(aircrafts))
-                    if goal_hamiltonian is None:
-                        goal_hamiltonian = h
-                    else:
-                        goal_hamiltonian += h
-            goal_hamiltonian /= sum(sum(cm))
-            hamiltonian += goal_hamiltonian
-
-        return hamiltonian.simplify()
+        if self.onehot == 'quadratic':
+            return qubo_to_hamiltonian(*self.get_qubo_matrix())
+        n = len(self.instance['cm'])
+        groups = self.get_onehot_groups()
+        if self.onehot == 'exact':
+            onehot_hamiltonian = exact_onehot_hamiltonian(groups, n)
+        elif self.onehot == 'xor':
+            # penalty (I + Z_group) / 2 for even number of chosen manouvers
+            z = np.zeros((len(groups) + 1, n), dtype=bool)
+            z[np.repeat(np.arange(len(groups)), [len(group) for group in groups]), np.concatenate(groups)] = True
+            coeffs = np.append(np.full(len(groups), 0.5), 0.5 * len(groups))
+            onehot_hamiltonian = SparsePauliOp(PauliList.from_symplectic(z, np.zeros_like(z)), coeffs)
+        else:
+            raise ValueError(f"Unknown onehot {self.onehot}, choose 'exact', 'quadratic' or 'xor'")
+        return (onehot_hamiltonian + qubo_to_hamiltonian(*self.get_qubo_matrix(onehot=False))).simplify()
 
     def get_mixer_hamiltonian(self) -> SparsePauliOp:
         cm = self.instance['cm']
-        aircrafts = self.instance['aircrafts']
 
         mixer_hamiltonian = None
-        for plane, manouvers in aircrafts.groupby(by='aircraft'):
-            h = ring_ham(manouvers.index.values.tolist(), len(cm))
+        for manouvers in self.get_onehot_groups():
+            h = ring_ham(manouvers.tolist(), len(cm))
             if mixer_hamiltonian is None:
                 mixer_hamiltonian = h
             else:
@@ -217,8 +167,8 @@ class QATMQiskit(problems.QATM, QiskitRoutine):
     def get_QAOAAnsatz_initial_state(self) -> QuantumCircuit:
         aircrafts = self.instance['aircrafts']
         qc = QuantumCircuit(len(aircrafts))
-        for plane, manouvers in aircrafts.groupby(by='aircraft'):
-            qc.x(manouvers.index.values.tolist()[0])
+        for manouvers in self.get_onehot_groups():
+            qc.x(int(manouvers[0]))
         return qc
 
 
@@ -0,0 +1,175 @@
+""" Cache of ansatz metrics and transpiled circuits shared by runs and processes """
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from qiskit import QuantumCircuit, qpy, transpile
+from qiskit.primitives import BackendSampler
+from qiskit.primitives.utils import _circuit_key
+from qiskit.quantum_info import SparsePauliOp
+
+from encoding_cache import fingerprint
+
+
+def circuit_fingerprint(circuit: QuantumCircuit | None) -> str | None:
+    """ Returns fingerprint of the functional content of the circuit, independent of parameter uuids """
+    if circuit is None:
+        return None
+    return fingerprint(repr(_circuit_key(circuit)))
+
+
+def backend_fingerprint(backend) -> str:
+    """ Returns fingerprint of what transpilation depends on: name, number of qubits, basis gates and coupling map """
+    if hasattr(backend, 'target'):
+        target = backend.target
+        coupling_map = target.build_coupling_map()
+        return fingerprint(backend.name, target.num_qubits, sorted(target.operation_names),
+                           None if coupling_map is None else sorted(coupling_map.get_edges()))
+    if hasattr(backend, 'configuration'):
+        configuration = backend.configuration()
+        return fingerprint(configuration.backend_name, configuration.n_qubits, sorted(configuration.basis_gates),
+                           sorted(map(tuple, configuration.coupling_map or [])))
+    return fingerprint(repr(backend))
+
+
+class CircuitCache:
+    """
+    Cache of circuit metrics (depth and CX count of the decomposed ansatz) and of transpiled circuits.
+
+    Entries are kept in memory (at most `max_entries` of each kind, least recently used are dropped) and,
+    if `directory` is given, also on disk as JSON and QPY files written atomically, so processes sharing
+    the directory share the entries. Keys of ansätze are made by `key` from the Hamiltonian, the number of layers,
+    the mixer and the initial state, keys of transpiled circuits also contain the backend and transpile options.
+
+    Attributes:
+        directory (str | None): Directory with cache entries, created if it doesn't exist.
+        max_entries (int): Maximal number of entries of each kind kept in memory.
+        hits (int): Number of entries read from the cache.
+        misses (int): Number of entries computed.
+
+    Example of usage:
+        cache = CircuitCache('/scratch/circuits')
+        qaoa = QAOA(p=5, circuit_cache=cache)
+        backend = QiskitBackend('backendv1v2_simulator', backendv1v2=FakeKyoto(), circuit_cache=cache)
+    """
+
+    def __init__(self, directory: str | None = None, max_entries: int = 128) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._metrics: OrderedDict[str, dict] = OrderedDict()
+        self._circuits: OrderedDict[str, QuantumCircuit] = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(hamiltonian: SparsePauliOp, p: int, mixer: SparsePauliOp | QuantumCircuit | None = None,
+            initial_state: QuantumCircuit | None = None) -> str:
+        """ Returns the key of the QAOA ansatz """
+        if isinstance(mixer, QuantumCircuit):
+            mixer = circuit_fingerprint(mixer)
+        return fingerprint('qaoa', hamiltonian, p, mixer, circuit_fingerprint(initial_state))
+
+    def _path(self, key: str, suffix: str) -> str | None:
+        return None if self.directory is None else os.path.join(self.directory, key + suffix)
+
+    def _remember(self, memory: OrderedDict, key: str, value: Any) -> None:
+        with self._lock:
+            memory[key] = value
+            memory.move_to_end(key)
+            while len(memory) > self.max_entries:
+                memory.popitem(last=False)
+
+    def _load(self, path: str | None, load: Callable[[Any], Any], binary: bool) -> Any:
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb' if binary else 'r') as file:
+                return load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _dump(self, path: str, value: Any, dump: Callable[[Any, Any], None], binary: bool) -> None:
+        descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb' if binary else 'w') as file:
+                dump(value, file)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _get_or_compute(self, memory: OrderedDict, key: str, compute: Callable[[], Any], suffix: str,
+                        load: Callable[[Any], Any], dump: Callable[[Any, Any], None], binary: bool) -> Any:
+        with self._lock:
+            value = memory.get(key)
+        path = self._path(key, suffix)
+        if value is None:
+            value = self._load(path, load, binary)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            self._remember(memory, key, value)
+            return value
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        self._remember(memory, key, value)
+        if path is not None:
+            self._dump(path, value, dump, binary)
+        return value
+
+    def metrics(self, key: str, ansatz: QuantumCircuit) -> dict:
+        """ Returns {'depth', 'cx_count'} of the ansatz decomposed into basic gates, computed once per key """
+        def compute() -> dict:
+            decomposed = ansatz.decompose(reps=10)
+            return {'depth': decomposed.depth(), 'cx_count': decomposed.count_ops().get('cx', 0)}
+        return self._get_or_compute(self._metrics, key, compute, '.json', json.load, json.dump, binary=False)
+
+    def transpiled(self, circuit: QuantumCircuit, backend, **transpile_options) -> QuantumCircuit:
+        """
+        Returns the circuit transpiled for the backend, transpiled once per circuit, backend and options.
+
+        Cached circuits made from other circuit objects (or loaded from disk) have equally named but different
+        parameters, so they are replaced with the parameters of the given circuit.
+        """
+        key = fingerprint('transpiled', circuit_fingerprint(circuit), backend_fingerprint(backend),
+                          repr(sorted(transpile_options.items())))
+        transpiled = self._get_or_compute(self._circuits, key,
+                                          lambda: transpile(circuit, backend, **transpile_options), '.qpy',
+                                          lambda file: qpy.load(file)[0], lambda value, file: qpy.dump(value, file),
+                                          binary=True)
+        parameters = {parameter.name: parameter for parameter in circuit.parameters}
+        replaced = {parameter: parameters[parameter.name] for parameter in transpiled.parameters
+                    if parameters.get(parameter.name) is not parameter}
+        return transpiled.assign_parameters(replaced) if replaced else transpiled
+
+
+DEFAULT_CIRCUIT_CACHE = CircuitCache()
+
+
+class CachedBackendSampler(BackendSampler):
+    """ BackendSampler taking transpiled circuits from a `CircuitCache`, so repeated runs skip transpilation """
+
+    def __init__(self, backend, circuit_cache: CircuitCache | None = None, **kwargs) -> None:
+        super().__init__(backend=backend, **kwargs)
+        self.circuit_cache = DEFAULT_CIRCUIT_CACHE if circuit_cache is None else circuit_cache
+
+    def _transpile(self) -> None:
+        for circuit in self._circuits[len(self._transpiled_circuits):]:
+            self._transpiled_circuits.append(
+                self.circuit_cache.transpiled(circuit, self.backend, **self.transpile_options.__dict__))
@@ -0,0 +1,72 @@
+""" Statevector QAOA simulator for cost Hamiltonians diagonal in Z """
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+from utils import hamiltonian_diagonal
+
+
+class DiagonalQAOASimulator:
+    """
+    Exact statevector simulator of the standard QAOA ansatz (|+> initial state, X mixer) for diagonal Hamiltonians.
+
+    The cost vector is computed once, the phase separator exp(-i gamma H) is an elementwise multiplication
+    and the mixer exp(-i beta X) is applied to blocks of `MIXER_BLOCK` qubits at once as butterflies
+    with the Kronecker power of the single qubit rotation, which keeps the passes over the state few and contiguous.
+    State and phase buffers are allocated once and reused by every evaluation.
+    Parameters are ordered as in Qiskit's QAOAAnsatz: [betas..., gammas...].
+
+    Attributes:
+        num_qubits (int): Number of qubits.
+        reps (int): Number of QAOA layers.
+        cost (np.ndarray): Energies of all computational basis states.
+    """
+    MIXER_BLOCK = 4
+
+    def __init__(self, hamiltonian: SparsePauliOp, reps: int = 1, dtype=np.complex128) -> None:
+        self.num_qubits = hamiltonian.num_qubits
+        self.reps = reps
+        self.cost = hamiltonian_diagonal(hamiltonian)
+        size = len(self.cost)
+        self._state = np.empty(size, dtype=dtype)
+        self._phase = np.empty(size, dtype=dtype)
+
+    def _apply_phase(self, gamma: float) -> None:
+        real, imag = self._phase.real, self._phase.imag
+        np.multiply(self.cost, -gamma, out=real)
+        np.sin(real, out=imag)
+        np.cos(real, out=real)
+        self._state *= self._phase
+
+    def _apply_mixer(self, beta: float) -> None:
+        rotation = np.array([[np.cos(beta), -1j * np.sin(beta)],
+                             [-1j * np.sin(beta), np.cos(beta)]], dtype=self._state.dtype)
+        qubit = 0
+        while qubit < self.num_qubits:
+            block = min(self.MIXER_BLOCK, self.num_qubits - qubit)
+            matrix = rotation
+            for _ in range(block - 1):
+                matrix = np.kron(matrix, rotation)
+            shape = (-1, 1 << block, 1 << qubit)
+            np.matmul(matrix, self._state.reshape(shape), out=self._phase.reshape(shape))
+            self._state, self._phase = self._phase, self._state
+            qubit += block
+
+    def statevector(self, parameters) -> np.ndarray:
+        """ Returns the state of the ansatz, the array is reused by the next evaluation """
+        parameters = np.asarray(parameters, dtype=float)
+        betas, gammas = parameters[:self.reps], parameters[self.reps:]
+        self._state.fill(1 / np.sqrt(len(self._state)))
+        for beta, gamma in zip(betas, gammas):
+            self._apply_phase(gamma)
+            self._apply_mixer(beta)
+        return self._state
+
+    def probabilities(self, parameters) -> np.ndarray:
+        state = self.statevector(parameters)
+        return state.real ** 2 + state.imag ** 2
+
+    def expectation(self, parameters) -> np.ndarray | float:
+        """ Returns energy of the ansatz, for a 2D array of parameters an array of energies """
+        points = np.reshape(parameters, (-1, 2 * self.reps))
+        values = np.array([np.dot(self.probabilities(point), self.cost) for point in points])
+        return values if np.ndim(parameters) > 1 else float(values[0])
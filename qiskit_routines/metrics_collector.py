@@ -0,0 +1,123 @@
+""" Asynchronous collector of processing times of runtime jobs """
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+
+class MetricsCollector:
+    """
+    Fetches metrics of runtime jobs tagged with a run tag in background threads.
+
+    For every tag the jobs are listed once and their metrics are fetched concurrently by at most `max_workers`
+    threads. Finished collections are kept by tag (at most `max_cached` latest ones), so collecting them again
+    (e.g. after the batch) doesn't query the service, and their futures are dropped.
+    The service has to provide `jobs(limit, job_tags)` returning jobs with `metrics()`, like QiskitRuntimeService.
+
+    Attributes:
+        max_workers (int): Maximal number of concurrent metrics requests.
+        max_cached (int): Maximal number of kept results of finished collections.
+
+    Example of usage:
+        qaoa = QAOA(p=3, defer_metrics=True)
+        results = [QuantumLauncher(problem, qaoa, backend).process()['results'] for problem in problems]
+        QAOA.metrics_collector.fill(results)
+    """
+
+    def __init__(self, max_workers: int = 8, max_cached: int = 1024) -> None:
+        self.max_workers = max_workers
+        self.max_cached = max_cached
+        self._futures: dict[str, Future] = {}
+        self._results: OrderedDict[str, tuple[list, list, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._tag_executor: ThreadPoolExecutor | None = None
+        self._metrics_executor: ThreadPoolExecutor | None = None
+
+    def __getstate__(self) -> dict:
+        return {'max_workers': self.max_workers, 'max_cached': self.max_cached}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def submit(self, tag: str, service) -> Future:
+        """ Starts collecting metrics of jobs with the tag, returns future of (timestamps, usages, qpu_time) """
+        with self._lock:
+            if tag in self._results:
+                future = Future()
+                future.set_result(self._results[tag])
+                return future
+            if tag in self._futures:
+                return self._futures[tag]
+            if self._tag_executor is None:
+                self._tag_executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='metrics-tag')
+                self._metrics_executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='metrics-job')
+            future = self._futures[tag] = self._tag_executor.submit(self._collect, tag, service,
+                                                                    self._metrics_executor)
+        future.add_done_callback(partial(self._done, tag))
+        return future
+
+    def _done(self, tag: str, future: Future) -> None:
+        """ Moves the result of a successful collection out of its future, failed ones wait for `get` """
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            if self._futures.get(tag) is future:
+                del self._futures[tag]
+            self._results[tag] = future.result()
+            self._results.move_to_end(tag)
+            while len(self._results) > self.max_cached:
+                self._results.popitem(last=False)
+
+    def _collect(self, tag: str, service, metrics_executor: ThreadPoolExecutor) -> tuple[list, list, float]:
+        jobs = service.jobs(limit=None, job_tags=[tag])
+        metrics = list(metrics_executor.map(lambda job: job.metrics(), jobs))
+        timestamps = [m['timestamps'] for m in metrics]
+        usages = [m['usage'] for m in metrics]
+        qpu_time = sum(m['usage']['quantum_seconds'] for m in metrics)
+        return timestamps, usages, qpu_time
+
+    def get(self, tag: str, timeout: float | None = None) -> tuple[list, list, float]:
+        """ Waits for metrics of the submitted tag, a failed collection can be submitted again """
+        with self._lock:
+            if tag in self._results:
+                return self._results[tag]
+            future = self._futures[tag]
+        try:
+            return future.result(timeout)
+        except Exception:
+            with self._lock:
+                if self._futures.get(tag) is future and future.done():
+                    del self._futures[tag]
+            raise
+
+    def fill(self, results: list[dict], service=None, timeout: float | None = None) -> list[dict]:
+        """
+        Sets 'timestamps', 'usages' and 'qpu_time' of results with pending metrics of their 'metrics_tag'.
+
+        Tags which weren't submitted to this collector (e.g. of results made by other processes) are submitted
+        with the given service, or skipped without it. All tags are submitted before waiting for any of them.
+        """
+        pending = [result for result in results
+                   if result.get('metrics_tag') is not None and result.get('usages') is None]
+        if service is not None:
+            for result in pending:
+                self.submit(result['metrics_tag'], service)
+        for result in pending:
+            if result['metrics_tag'] in self._futures or result['metrics_tag'] in self._results:
+                result['timestamps'], result['usages'], result['qpu_time'] = self.get(result['metrics_tag'], timeout)
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        """ Stops the threads once submitted collections finish, without `wait` it returns right away """
+        with self._lock:
+            tag_executor, metrics_executor = self._tag_executor, self._metrics_executor
+            self._tag_executor = self._metrics_executor = None
+        if tag_executor is None:
+            return
+        tag_executor.shutdown(wait)
+        if wait:
+            metrics_executor.shutdown()
+        else:
+            # pending collections still need the metrics threads, they are stopped after the last one
+            threading.Thread(target=lambda: (tag_executor.shutdown(), metrics_executor.shutdown()),
+                             daemon=True).start()
@@ -0,0 +1,127 @@
+""" Persistent store of optimized QAOA parameters used to warm start other depths and instances """
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+from encoding_cache import fingerprint
+from templates import Problem
+
+
+def interpolate_parameters(point, p: int) -> np.ndarray:
+    """
+    Returns parameters for depth p + 1 linearly interpolated from the optimal ones of depth p (INTERP strategy).
+
+    Betas and gammas are interpolated separately, the i-th angle of depth p + 1 is
+    (i - 1) / p * angle_{i - 1} + (p - i + 1) / p * angle_i with angle_0 = angle_{p + 1} = 0.
+
+    Args:
+        point: Parameters of depth p ordered as [betas..., gammas...].
+        p (int): Depth of the point.
+
+    Returns:
+        np.ndarray: Parameters of depth p + 1 in the same order.
+    """
+    point = np.asarray(point, dtype=float).reshape(2, p)
+    padded = np.pad(point, ((0, 0), (1, 1)))
+    i = np.arange(1, p + 2)
+    return ((i - 1) / p * padded[:, i - 1] + (p - i + 1) / p * padded[:, i]).ravel()
+
+
+class QAOAParameterStore:
+    """
+    JSON file with the best QAOA parameters found for every problem class, instance and depth.
+
+    Parameters are looked up by the class of the problem and features of the instance (number of qubits and
+    fingerprint of the Hamiltonian). If the depth wasn't optimized yet, the parameters of the deepest lower depth are
+    interpolated to it, see `interpolate_parameters`. With `transfer` new instances use the parameters of the instance
+    of the same class and size with most depths optimized, which works thanks to concentration of QAOA parameters.
+    The file is read on every lookup, and every update is merged with it and written atomically,
+    so the store can be shared by processes.
+
+    Attributes:
+        path (str): Path of the JSON file.
+        transfer (bool): Whether to use parameters of other instances of the same class and size.
+
+    Example of usage:
+        store = QAOAParameterStore('results/qaoa_parameters.json')
+        with AQLManager('my_path') as launcher:
+            launcher.add_algorithm(*[QAOA(p=p, parameter_store=store) for p in range(1, 6)])
+    """
+
+    def __init__(self, path: str, transfer: bool = False) -> None:
+        self.path = path
+        self.transfer = transfer
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def features(problem: Problem, hamiltonian: SparsePauliOp) -> tuple[str, str]:
+        """ Returns (class key, instance key) of the problem """
+        return f'{type(problem).__name__}@{hamiltonian.num_qubits}', fingerprint(hamiltonian)
+
+    def _depths(self, problem: Problem, hamiltonian: SparsePauliOp) -> dict:
+        class_key, instance_key = self.features(problem, hamiltonian)
+        with self._lock:
+            self._entries = self._load()
+        instances = self._entries.get(class_key, {})
+        if instance_key in instances or not self.transfer or not instances:
+            return instances.get(instance_key, {})
+        return max(instances.values(), key=len)
+
+    def get(self, problem: Problem, hamiltonian: SparsePauliOp, p: int) -> dict | None:
+        """ Returns the stored entry {'point': [...], 'energy': float} of depth p, if any """
+        return self._depths(problem, hamiltonian).get(str(p))
+
+    def initial_point(self, problem: Problem, hamiltonian: SparsePauliOp, p: int) -> np.ndarray | None:
+        """ Returns the stored point of depth p, or the one interpolated from the deepest lower depth, or None """
+        depths = self._depths(problem, hamiltonian)
+        lower = [int(depth) for depth in depths if int(depth) <= p]
+        if not lower:
+            return None
+        depth = max(lower)
+        point = np.asarray(depths[str(depth)]['point'], dtype=float)
+        for q in range(depth, p):
+            point = interpolate_parameters(point, q)
+        return point
+
+    def update(self, problem: Problem, hamiltonian: SparsePauliOp, p: int, point, energy: float) -> bool:
+        """ Stores the point if it's better than the stored one of depth p, returns whether it was stored """
+        class_key, instance_key = self.features(problem, hamiltonian)
+        entry = {'point': np.asarray(point, dtype=float).tolist(), 'energy': float(np.real(energy))}
+        with self._lock:
+            self._entries = self._load()
+            depths = self._entries.setdefault(class_key, {}).setdefault(instance_key, {})
+            stored = depths.get(str(p))
+            if stored is not None and stored['energy'] <= entry['energy']:
+                return False
+            depths[str(p)] = entry
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    json.dump(self._entries, file)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        return True
@@ -1,6 +1,18 @@
+from utils import EnergyEvaluator
+
+
 class QiskitRoutine:
     ROUTINE_NAME = 'qiskit'
 
     @property
     def ROUTINE_CLASS(self):
         return QiskitRoutine
+
+    def get_energy_evaluator(self, cache_diagonal: bool = False) -> EnergyEvaluator:
+        """
+        Returns evaluator of energies of batches of bitstrings for the Hamiltonian of the problem.
+
+        It's not an output method, because Hamiltonians of some problems (e.g. raw ones) aren't diagonal,
+        the Hamiltonian itself is memoized by `get_qiskit_hamiltonian`.
+        """
+        return EnergyEvaluator(self.get_qiskit_hamiltonian(), cache_diagonal=cache_diagonal)
@@ -0,0 +1,60 @@
+""" Sampler proxy measuring size and latency of every submitted batch """
+from time import perf_counter
+
+from qiskit import QuantumCircuit
+from qiskit.primitives.base.base_sampler import BaseSampler
+
+
+class TimedSampler:
+    """
+    Proxy of a sampler which records every `run` call as a batch.
+
+    The latency of a batch is the time from submitting the job to receiving its result, so for runtime backends
+    it includes queueing. Other attributes (e.g. `options`, `session`, `set_options`) are taken from the sampler.
+
+    Attributes:
+        sampler (BaseSampler): The wrapped sampler.
+        batches (list[dict]): Number of circuits and latency in seconds of every batch, in order of results.
+    """
+
+    def __init__(self, sampler: BaseSampler) -> None:
+        self.sampler = sampler
+        self.batches: list[dict] = []
+
+    def run(self, circuits, parameter_values=None, **run_options) -> '_TimedJob':
+        size = 1 if isinstance(circuits, QuantumCircuit) else len(circuits)
+        start = perf_counter()
+        job = self.sampler.run(circuits, parameter_values, **run_options)
+        return _TimedJob(job, self, size, start)
+
+    def __getattr__(self, name):
+        return getattr(self.sampler, name)
+
+    def summary(self) -> dict:
+        """ Returns number of batches, evaluated circuits and total and maximal latency """
+        latencies = [batch['latency'] for batch in self.batches]
+        return {'batches': len(self.batches),
+                'circuits': sum(batch['size'] for batch in self.batches),
+                'total_latency': sum(latencies),
+                'max_latency': max(latencies, default=0.0)}
+
+
+class _TimedJob:
+    """ Job proxy recording the latency of its batch when the result is received """
+
+    def __init__(self, job, sampler: TimedSampler, size: int, start: float) -> None:
+        self._job = job
+        self._sampler = sampler
+        self._size = size
+        self._start = start
+        self._recorded = False
+
+    def result(self):
+        result = self._job.result()
+        if not self._recorded:
+            self._recorded = True
+            self._sampler.batches.append({'size': self._size, 'latency': perf_counter() - self._start})
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._job, name)
@@ -2,9 +2,16 @@
 import json
 import os
 import pickle
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import wraps
 
+from encoding_cache import EncodingCache, fingerprint
+
+OutputCacheInfo = namedtuple('OutputCacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
 
 class _FileSavingSupportClass:
     """
@@ -141,6 +148,9 @@ class Problem(_SupportClass, ABC):
         name (str): The name of the problem.
         instance_name (str): The name of the instance.
         instance (any): An instance of the problem.
+        encoding_cache (EncodingCache | None): On-disk cache used by output methods, can be set for the class or instance.
+        OUTPUT_CACHE_SIZE (int | None): Maximal number of results memoized by output methods of an instance,
+            None for unbounded.
 
     Methods:
         set_instance(self, instance: any, instance_name: str | None = None) -> None:
@@ -151,8 +161,22 @@ class Problem(_SupportClass, ABC):
             Reads a result from a file.
         analyze_result(self, result) -> None:
             Analyzes the result.
+        output_cache_info(self) -> OutputCacheInfo:
+            Returns hit and miss counters of memoized output methods.
+        clear_output_cache(self) -> None:
+            Invalidates memoized results of output methods.
+        output_methods(self) -> list[str]:
+            Returns names of output methods.
+        prepare_methods(self, names: list[str] | None = None) -> None:
+            Computes results of output methods.
+        warm_up(self, names: list[str] | None = None, max_workers: int | None = None) -> dict[str, Future]:
+            Computes results of output methods in background threads.
 
     """
+    ENCODING_PARAMETERS: tuple[str, ...] = ()
+    OUTPUT_CACHE_SIZE: int | None = 32
+    encoding_cache: EncodingCache | None = None
+
     @abstractmethod
     def __init__(self, instance: any = None, instance_name: str | None = None, instance_path: str | None = None) -> None:
         """
@@ -170,12 +194,23 @@ class Problem(_SupportClass, ABC):
         self.path: str | None = None
         self.name = type(self).__name__.lower()
         self.instance_name: str = 'unnamed' if instance_name is None else instance_name
+        self._output_hits = 0
+        self._output_misses = 0
         self.instance: any = None
         if instance_path is None:
             self.set_instance(instance=instance, instance_name=instance_name)
         else:
             self.read_instance(instance_path)
 
+    @property
+    def instance(self) -> any:
+        return self._instance
+
+    @instance.setter
+    def instance(self, instance: any) -> None:
+        self._instance = instance
+        self.clear_output_cache()
+
     def set_instance(self, instance: any, instance_name: str | None = None) -> None:
         """
         Sets an instance of the problem.
@@ -242,22 +277,107 @@ class Problem(_SupportClass, ABC):
 
         """
 
+    @property
+    def encoding_parameters(self) -> dict:
+        """ Returns parameters which, together with the instance, determine the results of output methods. """
+        return {name: getattr(self, name, None) for name in self.ENCODING_PARAMETERS}
+
+    def _output_state(self) -> tuple[OrderedDict, dict, threading.Lock]:
+        """ Returns memoized results, per key locks and the lock guarding both, creating them if needed """
+        state = self.__dict__.get('_output_state_')
+        if state is None:
+            state = self.__dict__.setdefault('_output_state_', (OrderedDict(), {}, threading.Lock()))
+        return state
+
+    def clear_output_cache(self) -> None:
+        """ Invalidates memoized results of output methods, it's done whenever the instance is set """
+        results, _, lock = self._output_state()
+        with lock:
+            results.clear()
+
+    def output_cache_info(self) -> OutputCacheInfo:
+        """ Returns hits, misses, maximal and current size of the output methods memo """
+        results, _, lock = self._output_state()
+        with lock:
+            return OutputCacheInfo(self.__dict__.get('_output_hits', 0), self.__dict__.get('_output_misses', 0),
+                                   self.OUTPUT_CACHE_SIZE, len(results))
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop('_output_state_', None)
+        return state
+
     def output(func):
+        """
+        Memoizes results of the method per problem instance.
+
+        Results are keyed by the method, its arguments and `encoding_parameters`, so changing e.g. onehot
+        of the problem gives a new result. The memo is cleared when the instance is set. If `encoding_cache`
+        is set, results missing from the memo are read from (or stored into) the on-disk cache.
+        Concurrent calls with the same key are computed once.
+        """
         @wraps(func)
-        def wrapper(*args, **kwargs):
-            if wrapper.__solved:
-                return wrapper.__solved
-            wrapper.__solved = func(*args, **kwargs)
-            return wrapper.__solved
+        def wrapper(self, *args, **kwargs):
+            results, key_locks, lock = self._output_state()
+            key = (func.__qualname__, fingerprint(args, kwargs, self.encoding_parameters))
+            with lock:
+                key_lock = key_locks.setdefault(key, threading.Lock())
+            with key_lock:
+                try:
+                    with lock:
+                        if key in results:
+                            results.move_to_end(key)
+                            self._output_hits = self.__dict__.get('_output_hits', 0) + 1
+                            return results[key]
+                    if self.encoding_cache is None:
+                        result = func(self, *args, **kwargs)
+                    else:
+                        cache_key = self.encoding_cache.key(self, func, args, kwargs)
+                        result = self.encoding_cache.get_or_compute(cache_key, lambda: func(self, *args, **kwargs))
+                    with lock:
+                        self._output_misses = self.__dict__.get('_output_misses', 0) + 1
+                        results[key] = result
+                        while self.OUTPUT_CACHE_SIZE is not None and len(results) > self.OUTPUT_CACHE_SIZE:
+                            results.popitem(last=False)
+                finally:
+                    # the key lock is dropped also when computing fails
+                    with lock:
+                        if key_locks.get(key) is key_lock:
+                            del key_locks[key]
+            return result
         wrapper._is_output = True
-        wrapper.__solved = False
         return wrapper
 
-    def prepare_methods(self):
-        for attr_name in dir(self):
-            attr = getattr(self, attr_name)
-            if callable(attr) and hasattr(attr, '_is_output'):
-                attr()
+    def output_methods(self) -> list[str]:
+        """ Returns names of methods decorated with `Problem.output`, properties are not evaluated """
+        cls = type(self)
+        return [name for name in dir(cls) if getattr(getattr(cls, name, None), '_is_output', False)]
+
+    def prepare_methods(self, names: list[str] | None = None) -> None:
+        """ Computes results of given output methods, all of them by default """
+        for name in self.output_methods() if names is None else names:
+            getattr(self, name)()
+
+    def warm_up(self, names: list[str] | None = None, max_workers: int | None = None) -> dict[str, Future]:
+        """
+        Starts computing results of given output methods in a background thread pool.
+
+        Calls of a method which is still being computed wait for the result instead of computing it again,
+        so the warm-up can overlap with e.g. backend initialization. Exceptions are not memoized,
+        so they are raised again when the method is called.
+
+        Args:
+            names (list[str] | None): Names of output methods, all of them by default.
+            max_workers (int | None): Maximal number of threads.
+
+        Returns:
+            dict[str, Future]: Futures of results by method name.
+        """
+        names = self.output_methods() if names is None else list(names)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='warm-up')
+        futures = {name: executor.submit(getattr(self, name)) for name in names}
+        executor.shutdown(wait=False)
+        return futures
 
 
 class Algorithm(_SupportClass, ABC):
@@ -330,6 +450,11 @@ class QuantumLauncher(ABC, _FileSavingSupportClass):
         path (str): The path to save the results. Defaults to 'results/'.
         binding_params (dict or None): The parameters to be bound to the problem and algorithm. Defaults to None.
         encoding_type (type): The encoding type to be used changing the class of the problem. Defaults to None.
+        encoding_cache (EncodingCache or None): On-disk cache for the problem's encodings. Defaults to None.
+        lazy_outputs (bool): If True, problem's output methods are computed on first access instead of
+            all of them before running the algorithm. Defaults to False.
+        warm_up (list[str] or bool or None): Names of output methods to be computed in background threads
+            while the algorithm is set up, True for all of them. Implies lazy outputs. Defaults to None.
 
     Methods:
         _bind_parameters: Binds the specified parameters to the problem and algorithm.
@@ -354,7 +479,9 @@ class QuantumLauncher(ABC, _FileSavingSupportClass):
     """
 
     def __init__(self, problem: Problem, algorithm: Algorithm, backend: Backend = None,
-                 path: str = 'results/', binding_params: dict | None = None, encoding_type: type = None) -> None:
+                 path: str = 'results/', binding_params: dict | None = None, encoding_type: type = None,
+                 encoding_cache: EncodingCache | None = None, lazy_outputs: bool = False,
+                 warm_up: list[str] | bool | None = None) -> None:
         super().__init__()
         self.problem: Problem = problem
         self.algorithm: Algorithm = algorithm
@@ -365,6 +492,10 @@ class QuantumLauncher(ABC, _FileSavingSupportClass):
         self._res_path: str | None = None
         self.binding_params: dict | None = binding_params
         self.encoding_type: callable = encoding_type  # TODO variable to be renamed
+        self.encoding_cache: EncodingCache | None = encoding_cache
+        self.lazy_outputs: bool = lazy_outputs
+        self.warm_up: list[str] | bool | None = warm_up
+        self.warm_up_futures: dict[str, Future] = {}
 
     def _bind_parameters(self):
         """
@@ -394,7 +525,13 @@ class QuantumLauncher(ABC, _FileSavingSupportClass):
             self.problem.__class__ = self.encoding_type
         if self.binding_params is not None:
             self._bind_parameters()
-        self.problem.prepare_methods()
+            self.problem.clear_output_cache()
+        if self.encoding_cache is not None:
+            self.problem.encoding_cache = self.encoding_cache
+        if self.warm_up:
+            self.warm_up_futures = self.problem.warm_up(None if self.warm_up is True else self.warm_up)
+        elif not self.lazy_outputs:
+            self.problem.prepare_methods()
 
     def _run(self) -> dict:
         """
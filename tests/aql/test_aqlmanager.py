@@ -30,7 +30,8 @@ def test_runtime_dwave():
         assert x is not None
     for x in result_bitstring:
         assert isinstance(x, str)
-        assert len(x) == 2
+    # results come in order of completion, EC micro has 2 variables and runs (1+2) times, MaxCut default 6 and (1+2)*3
+    assert sorted(map(len, result_bitstring)) == [2] * (1+2) + [6] * (1+2) * 3
 
 
 def test_runtime_qiskit():
@@ -0,0 +1,54 @@
+import os
+
+from aql import BatchRunner
+from templates import Algorithm, Backend, Problem
+
+
+class SumProblem(Problem):
+    def __init__(self, instance):
+        super().__init__(instance=instance)
+
+    def _get_path(self):
+        return super()._get_path()
+
+    @Problem.output
+    def get_values(self):
+        return list(self.instance)
+
+
+class LocalBackend(Backend):
+    ROUTINE_CLASS = None
+
+    def __init__(self, name='local'):
+        super().__init__(name)
+
+
+class ScaleAlgorithm(Algorithm):
+    def __init__(self, scale):
+        super().__init__()
+        self.scale = scale
+
+    def _get_path(self):
+        return self.name
+
+    def run(self, problem, backend):
+        if self.scale < 0:
+            raise ValueError('negative scale')
+        return {'energy': self.scale * sum(problem.get_values()), 'pid': os.getpid()}
+
+    def get_bitstring(self, result):
+        return str(result['energy'])
+
+
+def test_batch_runner():
+    backends = [(LocalBackend('a'), 1), (LocalBackend('b'), 2)]
+    algorithms = [(ScaleAlgorithm(1), 1), (ScaleAlgorithm(-1), 1)]
+    problems = [(SumProblem([1, 2]), 1), (SumProblem([3]), 1)]
+    records = BatchRunner(max_workers=2, max_per_backend={'b': 1}).run(backends, algorithms, problems)
+
+    assert len(records) == 3 * 2 * 2
+    assert [record['index'] for record in records] == list(range(12))
+    assert [record['bitstring'] for record in records[:4]] == ['3', '3', None, None]
+    assert all('ValueError' in record['error'] for record in records if record['algorithm'] == 1)
+    assert all(record['time'] >= 0 for record in records)
+    assert backends[0][0].__class__ is LocalBackend and problems[0][0].output_cache_info().currsize == 0
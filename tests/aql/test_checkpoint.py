@@ -0,0 +1,65 @@
+from aql import AQLManager, CheckpointManifest
+from templates import Algorithm, Backend, Problem
+
+
+class ListProblem(Problem):
+    def __init__(self, instance, instance_name):
+        super().__init__(instance=instance, instance_name=instance_name)
+
+    def _get_path(self):
+        return super()._get_path()
+
+
+class LocalBackend(Backend):
+    ROUTINE_CLASS = None
+
+    def __init__(self):
+        super().__init__('local')
+
+
+class CountingAlgorithm(Algorithm):
+    def __init__(self):
+        super().__init__()
+        self.runs = 0
+
+    def _get_path(self):
+        return self.name
+
+    def run(self, problem, backend):
+        self.runs += 1
+        return {'energy': sum(problem.instance)}
+
+    def get_bitstring(self, result):
+        return str(result['energy'])
+
+
+def _sweep(manifest, algorithm, times):
+    with AQLManager('test', checkpoint=manifest) as launcher:
+        launcher.add(backend=LocalBackend(), algorithm=algorithm, problem=ListProblem([1, 2], 'a'), times=times)
+        launcher.add_problem(ListProblem([3], 'b'))
+    return launcher.result_bitstring
+
+
+def test_resumed_sweep_skips_completed_tasks(tmp_path):
+    path = str(tmp_path / 'sweep.manifest')
+    algorithm = CountingAlgorithm()
+    assert sorted(_sweep(path, algorithm, 2)) == ['3', '3', '3', '3']
+    assert algorithm.runs == 4 and len(CheckpointManifest(path)) == 4
+
+    assert _sweep(path, algorithm, 2) == []
+    assert algorithm.runs == 4
+
+    assert sorted(_sweep(path, algorithm, 3)) == ['3', '3']
+    assert algorithm.runs == 6
+    assert 'listproblem/b|countingalgorithm|local|2' in CheckpointManifest(path)
+
+
+def test_manifest_resumes_after_torn_lines(tmp_path):
+    path = str(tmp_path / 'sweep.manifest')
+    manifest = CheckpointManifest(path)
+    manifest.mark_done('a', index=0)
+    with open(path, mode='a', encoding='utf-8') as file:
+        file.write('{"key": "broken"}x\n{"key": "b", "ind')
+    for key in ('c', 'd'):
+        CheckpointManifest(path).mark_done(key)
+    assert CheckpointManifest(path).completed == {'a', 'c', 'd'}
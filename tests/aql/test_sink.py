@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pytest
+
+from aql import open_sink
+from aql.sink import to_jsonable
+
+
+class FakeResult:
+    def __init__(self):
+        self._eigenvalue = np.float64(-1.5)
+        self._best_measurement = {'bitstring': '01', 'value': np.complex128(1 - 1j)}
+        self._optimal_point = np.array([0.1, 0.2])
+
+
+def _records(n):
+    return [{'index': i, 'result': {'energy': -i, 'x': np.arange(2)}, 'bitstring': '01'} for i in range(n)]
+
+
+def test_to_jsonable():
+    assert to_jsonable(FakeResult()) == {'eigenvalue': -1.5,
+                                         'best_measurement': {'bitstring': '01', 'value': '(1-1j)'},
+                                         'optimal_point': [0.1, 0.2]}
+
+
+@pytest.mark.parametrize('format, path', [('jsonl', 'results.jsonl'), ('pickle', 'segments')])
+def test_sink_round_trip(tmp_path, format, path):
+    kwargs = {'segment_size': 2} if format == 'pickle' else {}
+    with open_sink(str(tmp_path / path), format, **kwargs) as sink:
+        for record in _records(5):
+            sink.write(record)
+        assert [record['index'] for record in sink.read(start=3)] == [3, 4]
+    records = list(open_sink(str(tmp_path / path), format, **kwargs))
+    assert [record['index'] for record in records] == list(range(5))
+    assert list(records[4]['result']['x']) == [0, 1]
+
+
+def test_jsonl_sink_after_crash(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    with open_sink(path, 'jsonl') as sink:
+        for record in _records(2):
+            sink.write(record)
+    with open(path, mode='a', encoding='utf-8') as file:
+        file.write('{"index": 2, "res')
+    for restart in range(2):
+        with open_sink(path, 'jsonl') as sink:
+            sink.write(_records(4)[2 + restart])
+    assert [record['index'] for record in open_sink(path, 'jsonl')] == [0, 1, 2, 3]
+
+    with open(path, mode='a', encoding='utf-8') as file:
+        file.write('{"index": 4, "res\n')
+    with open_sink(path, 'jsonl') as sink:
+        sink.write(_records(6)[5])
+    assert [record['index'] for record in open_sink(path, 'jsonl')] == [0, 1, 2, 3, 5]
+
+
+def test_parquet_sink(tmp_path):
+    pytest.importorskip('pyarrow')
+    with open_sink(str(tmp_path / 'parquet'), 'parquet', row_group_size=2) as sink:
+        for record in _records(3):
+            sink.write(record)
+        assert len(list(sink.read())) == 2
+    records = list(sink.read())
+    assert [record['index'] for record in records] == [0, 1, 2]
+    assert records[2]['result'] == {'energy': -2, 'x': [0, 1]}
+
+
+def test_follow(tmp_path):
+    sink = open_sink(str(tmp_path / 'results.jsonl'))
+    followed = []
+    reader = threading.Thread(target=lambda: followed.extend(sink.follow(poll_interval=0.01)))
+    reader.start()
+    for record in _records(4):
+        sink.write(record)
+    sink.close()
+    reader.join(timeout=10)
+    assert [record['index'] for record in followed] == [0, 1, 2, 3]
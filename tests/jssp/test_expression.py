@@ -0,0 +1,31 @@
+import itertools
+
+import numpy as np
+
+from jssp.expression import QuadraticExpression
+from jssp.pyqubo_scheduler import get_jss_bqm
+
+
+def test_squared_sum():
+    H = QuadraticExpression()
+    variables = [H.variable(label) for label in 'abc']
+    H.add_squared_sum(variables, constant=-1, lagrange=2)
+    H.add_quadratic(variables[0], variables[0], 3)
+    bqm = H.compile().to_bqm()
+    qubo, offset = H.to_qubo()
+    for x in itertools.product([0, 1], repeat=3):
+        expected = 2 * (sum(x) - 1) ** 2 + 3 * x[0]
+        assert np.isclose(bqm.energy(dict(zip('abc', x))), expected)
+        assert np.isclose(np.array(x) @ qubo @ np.array(x) + offset, expected)
+
+
+def test_jss_bqm_spin_view():
+    instance = {"cupcakes": [("mixer", 2), ("oven", 1)],
+                "smoothie": [("mixer", 1)],
+                "lasagna": [("oven", 2)]}
+    bqm = get_jss_bqm(instance, 4, lagrange_one_hot=1, lagrange_precedence=2, lagrange_share=5)
+    spin = bqm.spin
+    assert set(spin.linear.keys()) == set(bqm.variables)
+    for label_i, label_j in spin.quadratic.keys():
+        assert label_i in spin.linear and label_j in spin.linear
+    assert isinstance(spin.offset, float)
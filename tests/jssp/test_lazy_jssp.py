@@ -0,0 +1,24 @@
+from jssp.qiskit_scheduler import _cached_jss_hamiltonian, _cached_jss_scheduler
+from problems import JSSP
+
+INSTANCE = {"pancakes": [("pan", 2), ("plate", 1)],
+            "omelette": [("pan", 1)],
+            "toast": [("toaster", 2), ("plate", 1)]}
+
+
+def test_hamiltonians_built_lazily_and_shared():
+    _cached_jss_scheduler.cache_clear()
+    _cached_jss_hamiltonian.cache_clear()
+    pr = JSSP(4, 'quadratic', instance=INSTANCE, optimization_problem=True)
+    assert _cached_jss_scheduler.cache_info().currsize == 0
+    assert _cached_jss_hamiltonian.cache_info().currsize == 0
+
+    h_o = pr.h_o
+    info = _cached_jss_hamiltonian.cache_info()
+    assert (info.misses, info.hits, info.currsize) == (1, 0, 1)
+
+    other = JSSP(4, 'quadratic', instance={job: list(operations) for job, operations in INSTANCE.items()})
+    assert other.h_o is h_o
+    assert _cached_jss_hamiltonian.cache_info().hits == 1
+    assert other.h_pos_by_label is pr.h_pos_by_label
+    assert len(pr.h_label_by_pos) == h_o.num_qubits
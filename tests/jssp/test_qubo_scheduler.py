@@ -0,0 +1,42 @@
+import numpy as np
+
+from jssp.qubo_scheduler import QuboScheduler
+
+TOY = {"cupcakes": [("mixer", 2), ("oven", 1)],
+       "smoothie": [("mixer", 1)],
+       "lasagna": [("oven", 2)]}
+
+
+def test_qubo_bqm_and_hamiltonian_agree():
+    scheduler = QuboScheduler(TOY, 4, 'quadratic')
+    scheduler.build()
+    labels = [scheduler.H_label_by_pos[i] for i in range(scheduler.n)]
+    for optimization in [False, True]:
+        qubo, offset = scheduler.to_qubo(optimization)
+        bqm = scheduler.to_bqm(optimization)
+        energies = scheduler.to_hamiltonian(optimization).to_matrix(sparse=True).diagonal().real
+        for state in range(2 ** scheduler.n):
+            x = np.array([(state >> i) & 1 for i in range(scheduler.n)])
+            energy = x @ qubo @ x + offset
+            assert np.isclose(energy, bqm.energy(dict(zip(labels, x))))
+            assert np.isclose(energy, energies[state])
+
+
+def test_valid_schedule_has_zero_penalty():
+    scheduler = QuboScheduler(TOY, 4, 'quadratic')
+    scheduler.build()
+    qubo, offset = scheduler.to_qubo()
+    x = np.zeros(scheduler.n)
+    for label in ['cupcakes_0,0', 'cupcakes_1,2', 'smoothie_0,2', 'lasagna_0,0']:
+        x[scheduler.H_pos_by_label[label]] = 1
+    assert x @ qubo @ x + offset == 0
+
+
+def test_exact_onehot_hamiltonian():
+    scheduler = QuboScheduler(TOY, 4, 'exact')
+    scheduler.build()
+    states = np.arange(2 ** scheduler.n)[:, None] >> np.arange(scheduler.n) & 1
+    violations = sum(states[:, group].sum(axis=1) != 1 for group in scheduler.onehot_groups)
+    quadratic = scheduler.get_expression().to_hamiltonian().to_matrix(sparse=True).diagonal().real
+    energies = scheduler.to_hamiltonian().to_matrix(sparse=True).diagonal().real
+    assert np.allclose(energies, quadratic + violations)
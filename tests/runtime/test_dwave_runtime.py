@@ -1,7 +1,9 @@
 from templates import QuantumLauncher
-from dwave_routines import DwaveSolver, SimulatedAnnealingBackend
+from dwave_routines import DwaveSolver, SimulatedAnnealingBackend, PortfolioBackend
+from dwave_routines.algorithms import QUBOMatrix
 from problems import EC, JSSP, MaxCut, QATM, Raw
 import numpy as np
+from scipy.sparse import csr_matrix
 TESTING_DIR = 'testing'
 
 
@@ -61,3 +63,56 @@ def test_raw():
     assert inform is not None
     bitstring = solver.get_bitstring(inform)
     assert bitstring in ['00', '01', '10', '11']
+
+
+def test_qubo_matrix_into_bqm():
+    """ Testing function for the array QUBO conversion against the pyqubo one """
+    rng = np.random.default_rng(0)
+    matrix = rng.integers(-3, 4, (8, 8)).astype(float)
+    labels = [f'x{i}' for i in range(8)]
+    samples = rng.integers(0, 2, (32, 8))
+    for qubo in (matrix, matrix + matrix.T, csr_matrix(matrix)):
+        bqm, _ = QUBOMatrix(qubo, 1.5).qubo_matrix_into_bqm()
+        symbolic_bqm, _ = QUBOMatrix(qubo, 1.5).qubo_matrix_into_bqm(symbolic=True)
+        assert list(bqm.variables) == labels
+        assert np.allclose(bqm.energies((samples, labels)), symbolic_bqm.energies((samples, labels)))
+
+
+def test_raw_portfolio():
+    """ Testing function for Raw on the portfolio of local samplers """
+    qubo = np.array([[10, 1, 0], [0, -10, 2], [0, 0, -1]]), 0
+    pr = Raw(qubo)
+    solver = DwaveSolver(1, num_reads=10)
+    backend = PortfolioBackend(repeats=2, max_workers=2)
+    launcher = QuantumLauncher(pr, solver, backend, path=TESTING_DIR)
+
+    inform = launcher._run()
+    assert set(inform.record.sampler) == {'tabu', 'simulated_annealing', 'steepest_descent'}
+    assert inform.info['samplers']['tabu']['best_energy'] == inform.first.energy
+    assert len(solver.get_bitstring(inform)) == 3
+
+
+def test_maxcut_qubo():
+    """ Testing function for the sparse Max Cut QUBO on a generated instance """
+    graph = MaxCut.generate_maxcut_instance(12, 0.4, seed=0)
+    pr = MaxCut(graph)
+    launcher = QuantumLauncher(pr, DwaveSolver(1), SimulatedAnnealingBackend(), path=TESTING_DIR)
+    launcher._prepare_problem()
+    qubo, offset = pr.get_qubo()
+    samples = np.random.default_rng(0).integers(0, 2, (32, 12))
+    uncut = [sum(sample[i] == sample[j] for i, j in graph.edges) for sample in samples]
+    assert np.allclose(np.einsum('ij,ij->i', samples @ qubo, samples) + offset, uncut)
+
+
+def test_raw_portfolio_default_seed():
+    """ Testing function for the portfolio with random seeds of repeated simulated annealing """
+    qubo = np.array([[10, 1, 0], [0, -10, 2], [0, 0, -1]]), 0
+    pr = Raw(qubo)
+    solver = DwaveSolver(1, num_reads=16)
+    backend = PortfolioBackend(portfolio=[('simulated_annealing', {})], repeats=8, max_workers=2)
+    launcher = QuantumLauncher(pr, solver, backend, path=TESTING_DIR)
+
+    for _ in range(3):
+        inform = launcher._run()
+        assert set(inform.record.sampler) == {'simulated_annealing'}
+        assert inform.first.energy == inform.info['samplers']['simulated_annealing']['best_energy']
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from qiskit_routines.metrics_collector import MetricsCollector
+
+
+class MockJob:
+    def __init__(self, service, seconds):
+        self.service = service
+        self.seconds = seconds
+
+    def metrics(self):
+        with self.service.lock:
+            self.service.running += 1
+            self.service.max_running = max(self.service.max_running, self.service.running)
+        time.sleep(0.01)
+        with self.service.lock:
+            self.service.running -= 1
+            self.service.metrics_calls += 1
+        return {'timestamps': {'created': 0}, 'usage': {'quantum_seconds': self.seconds, 'seconds': self.seconds}}
+
+
+class MockService:
+    """ Offline stand-in of QiskitRuntimeService with tagged jobs """
+
+    def __init__(self, jobs_by_tag):
+        self.jobs_by_tag = {tag: [MockJob(self, seconds) for seconds in jobs] for tag, jobs in jobs_by_tag.items()}
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.jobs_calls = 0
+        self.metrics_calls = 0
+
+    def jobs(self, limit=None, job_tags=None):
+        self.jobs_calls += 1
+        return [job for tag in job_tags for job in self.jobs_by_tag.get(tag, [])]
+
+
+def test_collect_bounded_and_cached():
+    service = MockService({'run-a': [1, 2, 3, 4, 5, 6], 'run-b': [10]})
+    collector = MetricsCollector(max_workers=2)
+    collector.submit('run-a', service)
+    timestamps, usages, qpu_time = collector.get('run-a')
+    assert len(timestamps) == len(usages) == 6
+    assert qpu_time == 21
+    assert service.max_running <= 2
+    collector.submit('run-a', service)
+    assert collector.get('run-a')[2] == 21
+    assert service.jobs_calls == 1 and service.metrics_calls == 6
+    collector.shutdown()
+    assert not collector._futures
+
+
+def test_cached_results_bounded():
+    service = MockService({f'run-{i}': [i] for i in range(5)})
+    collector = MetricsCollector(max_cached=2)
+    for i in range(5):
+        collector.submit(f'run-{i}', service).result()
+    collector.shutdown()
+    assert list(collector._results) == ['run-3', 'run-4'] and not collector._futures
+    assert collector.get('run-4')[2] == 4
+
+
+def test_fill_deferred_results():
+    service = MockService({'run-a': [1, 2], 'run-b': [10]})
+    collector = MetricsCollector()
+    results = [{'metrics_tag': 'run-a', 'usages': None}, {'metrics_tag': 'run-b', 'usages': None},
+               {'metrics_tag': 'local', 'usages': [], 'qpu_time': 0}]
+    collector.fill(results, service=service)
+    assert [result['qpu_time'] for result in results] == [3, 10, 0]
+    assert len(results[0]['usages']) == 2
+    collector.shutdown()
+
+
+def test_shutdown_without_wait_finishes_pending_tags():
+    service = MockService({'run-a': [1, 2], 'run-b': [10]})
+    collector = MetricsCollector(max_workers=1)
+    futures = [collector.submit(tag, service) for tag in ('run-a', 'run-b')]
+    collector.shutdown(wait=False)
+    assert [future.result(timeout=5)[2] for future in futures] == [3, 10]
+    assert collector.get('run-b')[2] == 10
@@ -1,5 +1,5 @@
 from templates import QuantumLauncher
-from orca_routines import BBS, OrcaBackend
+from orca_routines import BBS, LocalOrcaBackend, OrcaBackend
 from problems import EC, JSSP, MaxCut, QATM, Raw
 import numpy as np
 TESTING_DIR = 'testing'
@@ -51,3 +51,40 @@ def test_raw():
 
     bitstring = bbs.get_bitstring(inform)
     assert bitstring in ['00', '01', '10', '11']
+
+
+def test_raw_local():
+    """ Testing function for Raw on the local stand-in backend """
+    qubo = None, np.array([[10, 1, 0], [0, -10, 2], [0, 0, -1]])
+    pr = Raw(qubo)
+    bbs = BBS(updates=20, gradient_mode='paramshift')
+    backend = LocalOrcaBackend(seed=0)
+    launcher = QuantumLauncher(pr, bbs, backend, path=TESTING_DIR)
+
+    inform = launcher._run()
+    assert bbs.get_bitstring(inform) == '010'
+    assert bbs.bbs.E_min_encountered == -10
+
+
+def test_batch_objective():
+    """ Testing function for batched objectives against the per-sample ones """
+    for pr in (EC('exact', instance_name='toy'), JSSP(3, 'exact', instance_name='toy', optimization_problem=True)):
+        launcher = QuantumLauncher(pr, BBS(), LocalOrcaBackend(), path=TESTING_DIR)
+        launcher._prepare_problem()
+        qubo_fn_fact, Q = pr.get_orca_qubo()
+        qubo_fn = qubo_fn_fact(Q)
+        samples = np.random.default_rng(0).integers(0, 2, (16, len(Q)))
+        assert np.allclose(pr.get_batch_objective()(samples), [qubo_fn(sample) for sample in samples])
+
+
+def test_maxcut_generated():
+    """ Testing function for the Orca Max Cut QUBO of a graph larger than the default one """
+    graph = MaxCut.generate_maxcut_instance(12, 0.4, seed=0)
+    pr = MaxCut(graph)
+    launcher = QuantumLauncher(pr, BBS(), LocalOrcaBackend(), path=TESTING_DIR)
+    launcher._prepare_problem()
+    _, Q = pr.get_orca_qubo()
+    assert len(Q) == 12
+    samples = np.random.default_rng(0).integers(0, 2, (32, 12))
+    uncut = np.array([sum(sample[i] == sample[j] for i, j in graph.edges) for sample in samples])
+    assert np.allclose(pr.get_batch_objective()(samples), uncut - graph.number_of_edges())
@@ -1,7 +1,11 @@
 from templates import QuantumLauncher
-from qiskit_routines import QAOA, QiskitBackend, FALQON
+from qiskit_routines import QAOA, QiskitBackend, FALQON, QAOAParameterStore, CircuitCache
 from problems import EC, JSSP, MaxCut, QATM, Raw
+from qiskit.providers.fake_provider import GenericBackendV2
+from qiskit.circuit.library import QAOAAnsatz
 from qiskit.quantum_info import SparsePauliOp
+from utils import hamiltonian_diagonal
+import numpy as np
 TESTING_DIR = 'testing'
 
 
@@ -74,3 +78,110 @@ def test_raw():
     assert inform is not None
     bitstring = qaoa.get_bitstring(inform)
     assert bitstring in ['00', '01', '10', '11']
+
+
+def test_maxcut_population():
+    """ Testing function for QAOA started from a batch evaluated population """
+    pr = MaxCut(instance_name='default')
+    qaoa = QAOA(p=2, initial_population=8, restarts=2, seed=0)
+    backend = QiskitBackend('local_simulator')
+    launcher = QuantumLauncher(pr, qaoa, backend, path=TESTING_DIR)
+
+    inform = launcher._run()
+    assert inform['batches'][0]['size'] == 8
+    assert inform['batches_summary']['circuits'] >= 8
+
+
+def test_maxcut_diagonal_simulator():
+    """ Testing function for QAOA on the diagonal statevector simulator """
+    pr = MaxCut(instance_name='default')
+    qaoa = QAOA(p=2)
+    backend = QiskitBackend('diagonal_simulator')
+    launcher = QuantumLauncher(pr, qaoa, backend, path=TESTING_DIR)
+
+    inform = launcher._run()
+    hamiltonian = pr.get_qiskit_hamiltonian()
+    assert len(qaoa.get_bitstring(inform)) == hamiltonian.num_qubits
+    assert inform['SamplingVQEResult'].eigenvalue >= inform['SamplingVQEResult'].best_measurement['value'] - 1e-9
+
+
+def test_raw_parameter_store(tmp_path):
+    """ Testing function for QAOA depths warm started from the parameter store """
+    store = QAOAParameterStore(str(tmp_path / 'parameters.json'))
+    hamiltonian = SparsePauliOp.from_list([("ZZII", 1), ("IZZI", 1), ("IIZZ", 1), ("ZIIZ", 1), ("IIIZ", 0.5)])
+    pr = Raw(hamiltonian)
+    backend = QiskitBackend('diagonal_simulator')
+    for p in (1, 2):
+        qaoa = QAOA(p=p, parameter_store=store)
+        QuantumLauncher(pr, qaoa, backend, path=TESTING_DIR)._run()
+        assert store.get(pr, hamiltonian, p) is not None
+    assert len(QAOAParameterStore(store.path).initial_point(pr, hamiltonian, 3)) == 6
+
+
+def test_raw_circuit_cache(tmp_path):
+    """ Testing function for metrics and transpiled ansatz reused by repeated runs """
+    hamiltonian = SparsePauliOp.from_list([("ZZI", 1), ("IZZ", 1), ("ZIZ", 1)])
+    fake_backend = GenericBackendV2(num_qubits=3, seed=0)
+    informs = []
+    for _ in range(2):
+        cache = CircuitCache(str(tmp_path))
+        qaoa = QAOA(p=2, circuit_cache=cache)
+        backend = QiskitBackend('backendv1v2_simulator', backendv1v2=fake_backend, circuit_cache=cache)
+        informs.append(QuantumLauncher(Raw(hamiltonian), qaoa, backend, path=TESTING_DIR)._run())
+    assert cache.misses == 0 and cache.hits >= 2
+    assert informs[0]['depth'] == informs[1]['depth']
+    assert informs[0]['cx_count'] == informs[1]['cx_count']
+
+
+def test_ec_hamiltonian():
+    """ Testing function for the incidence matrix Exact Cover Hamiltonians against the penalty of every selection """
+    for onehot in ('quadratic', 'exact'):
+        pr = EC(onehot, instance_name='toy')
+        launcher = QuantumLauncher(pr, QAOA(), QiskitBackend('local_simulator'), path=TESTING_DIR)
+        launcher._prepare_problem()
+        routes = range(len(pr.instance))
+        covers = [[sum(element in pr.instance[r] for r in routes if state >> r & 1) for element in set().union(*pr.instance)]
+                  for state in range(2 ** len(pr.instance))]
+        if onehot == 'quadratic':
+            penalties = [sum((count - 1) ** 2 for count in counts) for counts in covers]
+        else:
+            penalties = [sum(count != 1 for count in counts) for counts in covers]
+        assert np.allclose(hamiltonian_diagonal(pr.get_qiskit_hamiltonian()), penalties)
+
+
+def test_qatm_hamiltonian():
+    """ Testing function for the array QATM Hamiltonians against collisions, onehot penalties and changes """
+    for onehot in ('quadratic', 'exact', 'xor'):
+        pr = QATM(onehot, instance_name='RCP_4.txt', instance_path='data/qatm/', optimization_problem=True)
+        launcher = QuantumLauncher(pr, QAOA(), QiskitBackend('local_simulator'), path=TESTING_DIR)
+        launcher._prepare_problem()
+        cm, aircrafts = pr.instance['cm'], pr.instance['aircrafts']
+        states = np.arange(2 ** len(cm))[:, None] >> np.arange(len(cm)) & 1
+        counts = np.stack([states[:, group].sum(axis=1) for group in pr.get_onehot_groups()], axis=1)
+        penalties = {'quadratic': (counts - 1) ** 2, 'exact': counts != 1, 'xor': counts % 2 == 0}[onehot].sum(axis=1)
+        collisions = np.einsum('ij,ij->i', states @ np.triu(cm == 1, k=1), states)
+        changes = states @ (aircrafts['manouver'] != aircrafts['aircraft']).to_numpy() / cm.sum()
+        assert np.allclose(hamiltonian_diagonal(pr.get_qiskit_hamiltonian()), penalties + collisions + changes)
+
+
+def test_circuit_cache_backend_key():
+    """ Testing function for transpiled circuits of equally named backends with different coupling maps """
+    cache = CircuitCache()
+    ring = GenericBackendV2(4, coupling_map=[[0, 1], [1, 2], [2, 3], [3, 0]], seed=0)
+    line = GenericBackendV2(4, coupling_map=[[0, 1], [1, 2], [2, 3]], seed=0)
+    assert ring.name == line.name
+    hamiltonian = SparsePauliOp.from_sparse_list([('ZZ', [0, 3], 1), ('ZZ', [1, 2], 1)], 4)
+    circuit = QAOAAnsatz(hamiltonian, reps=1).decompose(reps=3)
+    circuit.measure_all()
+    for backend in (ring, line, GenericBackendV2(4, coupling_map=[[0, 1], [1, 2], [2, 3], [3, 0]], seed=0)):
+        cache.transpiled(circuit, backend, seed_transpiler=0)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_batch_size_keeps_backend_optimizer():
+    """ Testing function for batch_size not leaking into the optimizer of the backend """
+    pr = Raw(SparsePauliOp.from_sparse_list([('ZZ', [0, 1], 1), ('Z', [0], 0.5)], 2))
+    backend = QiskitBackend('local_simulator')
+    launcher = QuantumLauncher(pr, QAOA(p=1, batch_size=4), backend, path=TESTING_DIR)
+    launcher._run()
+    assert backend.optimizer._max_evals_grouped in (None, 1)
@@ -0,0 +1,96 @@
+import dimod
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+from scipy.sparse import csr_matrix
+
+from encoding_cache import EncodingCache, fingerprint
+from templates import Problem
+
+
+def _make_problem_class():
+    """ Output methods memoize their first result, so every test needs a fresh class """
+    class CountingProblem(Problem):
+        ENCODING_PARAMETERS = ('onehot',)
+        calls = 0
+
+        def __init__(self, instance, onehot='exact'):
+            super().__init__(instance=instance)
+            self.onehot = onehot
+
+        def _get_path(self):
+            return super()._get_path()
+
+        @Problem.output
+        def get_hamiltonian(self):
+            type(self).calls += 1
+            return SparsePauliOp.from_sparse_list([('ZZ', [0, 1], len(self.instance))], 2)
+
+    return CountingProblem
+
+
+def test_fingerprint():
+    assert fingerprint({1, 2, 3}) == fingerprint({3, 2, 1})
+    assert fingerprint([1, 2]) != fingerprint([2, 1])
+    assert fingerprint(np.arange(3)) != fingerprint(np.arange(3, dtype=float))
+    assert fingerprint({'a': [1, 2]}) == fingerprint({'a': [1, 2]})
+
+
+def test_round_trip(tmp_path):
+    cache = EncodingCache(str(tmp_path))
+    hamiltonian = SparsePauliOp.from_sparse_list([('ZZ', [0, 9], 1.5), ('X', [3], -2), ('', [], 0.5)], 10)
+    bqm = dimod.BinaryQuadraticModel({'a': 1, 'b': -2}, {('a', 'b'): 3}, 0.5, dimod.BINARY)
+    values = {
+        'hamiltonian': hamiltonian,
+        'qubo': (np.arange(9.).reshape(3, 3), 2.0),
+        'sparse': csr_matrix(np.eye(4)),
+        'bqm': bqm,
+    }
+    for key, value in values.items():
+        assert cache.put(key, value)
+    assert cache.get('hamiltonian').equiv(hamiltonian)
+    qubo, offset = cache.get('qubo')
+    assert (qubo == values['qubo'][0]).all() and offset == 2.0
+    assert (cache.get('sparse') != values['sparse']).nnz == 0
+    assert cache.get('bqm') == bqm
+    assert cache.get('missing') is None
+    assert not cache.put('function', (lambda x: x, 1))
+
+
+def test_truncated_entry_is_a_miss(tmp_path):
+    cache = EncodingCache(str(tmp_path))
+    assert cache.put('key', np.arange(1000))
+    path = cache._path('key')
+    with open(path, 'rb') as file:
+        content = file.read()
+    for size in (len(content) // 2, 10):
+        with open(path, 'wb') as file:
+            file.write(content[:size])
+        assert cache.get('key', 'missing') == 'missing'
+    assert cache.put('key', np.arange(3))
+    assert list(cache.get('key')) == [0, 1, 2]
+
+
+def test_eviction(tmp_path):
+    cache = EncodingCache(str(tmp_path), max_size=3000)
+    for i in range(5):
+        cache.put(str(i), np.zeros(100))
+    assert cache.get('0') is None
+    assert cache.get('4') is not None
+
+
+def test_output_cache_shared_between_instances(tmp_path):
+    cache = EncodingCache(str(tmp_path))
+    first_class = _make_problem_class()
+    first_class.encoding_cache = cache
+    hamiltonian = first_class([1, 2]).get_hamiltonian()
+
+    second_class = _make_problem_class()
+    second_class.encoding_cache = cache
+    assert second_class([1, 2]).get_hamiltonian().equiv(hamiltonian)
+    assert (first_class.calls, second_class.calls) == (1, 0)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    third_class = _make_problem_class()
+    third_class.encoding_cache = cache
+    third_class([1, 2], onehot='quadratic').get_hamiltonian()
+    assert third_class.calls == 1
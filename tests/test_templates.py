@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+
+from templates import Algorithm, Backend, Problem, QuantumLauncher
+
+
+class CountingProblem(Problem):
+    ENCODING_PARAMETERS = ('scale',)
+    OUTPUT_CACHE_SIZE = 2
+
+    def __init__(self, instance, scale=1):
+        super().__init__(instance=instance)
+        self.scale = scale
+        self.calls = 0
+
+    def _get_path(self):
+        return super()._get_path()
+
+    @Problem.output
+    def get_encoding(self, shift=0):
+        self.calls += 1
+        return [self.scale * x + shift for x in self.instance]
+
+
+def test_output_is_memoized_per_instance():
+    first, second = CountingProblem([1, 2]), CountingProblem([3])
+    assert first.get_encoding() == [1, 2]
+    assert second.get_encoding() == [3]
+    assert first.get_encoding() is first.get_encoding()
+    assert first.calls == 1
+    assert first.output_cache_info() == (2, 1, 2, 1)
+
+
+def test_output_is_invalidated():
+    problem = CountingProblem([1, 2])
+    problem.get_encoding()
+    problem.set_instance([5])
+    assert problem.get_encoding() == [5]
+    problem.scale = 2
+    assert problem.get_encoding() == [10]
+    assert problem.get_encoding(shift=1) == [11]
+    assert problem.calls == 4
+    assert problem.output_cache_info().currsize == 2
+
+
+def test_output_is_computed_once_by_threads():
+    problem = CountingProblem(list(range(1000)))
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: problem.get_encoding(), range(32)))
+    assert problem.calls == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_failed_output_drops_key_lock():
+    problem = CountingProblem([1, 'a'])
+    for _ in range(2):
+        try:
+            problem.get_encoding(shift=1)
+        except TypeError:
+            pass
+        else:
+            raise AssertionError('get_encoding should fail')
+    assert problem._output_state()[1] == {}
+    assert problem.calls == 2
+
+
+def test_problem_is_picklable():
+    problem = CountingProblem([1, 2])
+    problem.get_encoding()
+    copy = pickle.loads(pickle.dumps(problem))
+    assert copy.get_encoding() == [1, 2]
+    assert copy.output_cache_info().currsize == 1
+
+
+class DummyBackend(Backend):
+    ROUTINE_CLASS = None
+
+    def __init__(self):
+        super().__init__('dummy')
+
+
+class DummyAlgorithm(Algorithm):
+    def __init__(self):
+        super().__init__()
+
+    def _get_path(self):
+        return self.name
+
+    def run(self, problem, backend):
+        return {'energy': sum(problem.get_encoding())}
+
+    def get_bitstring(self, result):
+        return ''
+
+
+def test_launcher_prepares_outputs():
+    problem = CountingProblem([1, 2])
+    assert problem.output_methods() == ['get_encoding']
+    QuantumLauncher(problem, DummyAlgorithm(), DummyBackend(), lazy_outputs=True)._prepare_problem()
+    assert problem.calls == 0
+    assert QuantumLauncher(problem, DummyAlgorithm(), DummyBackend())._run() == {'energy': 3}
+    assert problem.calls == 1
+
+
+def test_warm_up():
+    problem = CountingProblem([1, 2])
+    launcher = QuantumLauncher(problem, DummyAlgorithm(), DummyBackend(), warm_up=['get_encoding'])
+    assert launcher._run() == {'energy': 3}
+    assert launcher.warm_up_futures['get_encoding'].result() == [1, 2]
+    assert problem.calls == 1
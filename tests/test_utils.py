@@ -2,22 +2,74 @@ from qiskit_optimization.converters import QuadraticProgramToQubo
 from qiskit_optimization.translators import from_ising
 from qiskit.quantum_info import SparsePauliOp
 import numpy as np
+from scipy.sparse import csr_matrix
 
-from utils import qubo_to_hamiltonian, _qubo_dict_into_hamiltonian, _qubo_matrix_into_hamiltonian
-
-
-def _hamiltonian_to_qubo(hamiltonian: SparsePauliOp) -> tuple[np.ndarray, float]:
-    qp = from_ising(hamiltonian)
-    conv = QuadraticProgramToQubo()
-    qubo = conv.convert(qp).objective
-    return qubo.quadratic.to_array(), qubo.constant
+from utils import qubo_to_hamiltonian, _qubo_dict_into_hamiltonian, _qubo_matrix_into_hamiltonian, _qubo_array_into_hamiltonian, \
+    qubo_dict_to_hamiltonian, hamiltonian_diagonal, EnergyEvaluator, hamiltonian_to_qubo, exact_onehot_hamiltonian
 
 
 def test_qubo_dict_to_hamiltonian():
     qubo, offset = {('a', 'a'): 1, ('a', 'b'): 2, ('b', 'b'): 3}, 2
     hamiltonian = _qubo_dict_into_hamiltonian(qubo, offset=offset)
     assert hamiltonian.num_qubits == 2
-    new_qubo, new_offset = _hamiltonian_to_qubo(hamiltonian)
+    new_qubo, new_offset = hamiltonian_to_qubo(hamiltonian)
     assert new_offset == offset
     qubo_matrix = [[1, 2], [0, 3]]
     assert (new_qubo == qubo_matrix).all()
+
+
+def test_qubo_array_to_hamiltonian():
+    rng = np.random.default_rng(0)
+    qubo = rng.integers(-3, 4, (8, 8)) * (rng.random((8, 8)) < 0.5)
+    expected = _qubo_matrix_into_hamiltonian(qubo.tolist(), offset=1.5)
+    assert _qubo_array_into_hamiltonian(qubo, offset=1.5).equiv(expected)
+    assert qubo_to_hamiltonian(csr_matrix(qubo), offset=1.5).equiv(expected)
+
+
+def test_qubo_dict_to_hamiltonian_with_labels():
+    qubo = {('b', 'b'): 3, ('a', 'b'): 2, ('b', 'a'): 1, ('a', 'a'): 1, ('c', 'a'): -1}
+    hamiltonian, pos_by_label, label_by_pos = qubo_dict_to_hamiltonian(qubo, offset=2)
+    assert hamiltonian.equiv(_qubo_dict_into_hamiltonian(qubo, offset=2))
+    assert pos_by_label == {'a': 0, 'b': 1, 'c': 2}
+    assert label_by_pos == {0: 'a', 1: 'b', 2: 'c'}
+
+
+def test_hamiltonian_diagonal():
+    hamiltonian = SparsePauliOp.from_sparse_list([('ZZ', [0, 3], 1.5), ('Z', [1], -2), ('', [], 0.3),
+                                                  ('ZZZ', [0, 2, 4], 0.7)], 5)
+    assert np.allclose(hamiltonian_diagonal(hamiltonian), np.real(np.diag(hamiltonian.to_matrix())))
+
+
+def test_energy_evaluator():
+    hamiltonian = SparsePauliOp.from_sparse_list([('ZZ', [0, 3], 1.5), ('Z', [1], -2), ('', [], 0.3),
+                                                  ('ZZZ', [0, 2, 4], 0.7), ('ZZ', [3, 0], 0.5)], 5)
+    expected = np.real(np.diag(hamiltonian.to_matrix()))
+    states = np.arange(32)
+    bits = ((states[:, None] >> np.arange(5)) & 1).astype(np.uint8)
+    evaluator = EnergyEvaluator(hamiltonian)
+    assert np.allclose(evaluator.evaluate_bits(bits), expected)
+    assert np.allclose(evaluator.evaluate_packed(np.packbits(bits, axis=1, bitorder='little')), expected)
+    assert np.allclose(evaluator.evaluate_integers(states), expected)
+    assert np.allclose(evaluator.evaluate_bitstrings([format(state, '05b') for state in states]), expected)
+    assert np.allclose(EnergyEvaluator(hamiltonian, cache_diagonal=True).evaluate_integers(states), expected)
+
+
+def test_hamiltonian_to_qubo():
+    rng = np.random.default_rng(1)
+    qubo = np.triu(rng.integers(-3, 4, (8, 8)) * (rng.random((8, 8)) < 0.5)).astype(float)
+    hamiltonian = qubo_to_hamiltonian(qubo, offset=1.5)
+    new_qubo, new_offset = hamiltonian_to_qubo(hamiltonian)
+    assert np.allclose(new_qubo, qubo) and np.isclose(new_offset, 1.5)
+    sparse_qubo, _ = hamiltonian_to_qubo(hamiltonian, sparse=True)
+    assert np.allclose(sparse_qubo.toarray(), qubo)
+
+    objective = QuadraticProgramToQubo().convert(from_ising(hamiltonian)).objective
+    assert np.allclose(new_qubo, objective.quadratic.to_array()) and np.isclose(new_offset, objective.constant)
+
+
+def test_exact_onehot_hamiltonian():
+    groups = [[0, 2], [1, 2, 3], [3]]
+    diagonal = hamiltonian_diagonal(exact_onehot_hamiltonian(groups, 4))
+    states = np.arange(16)[:, None] >> np.arange(4) & 1
+    expected = sum(states[:, group].sum(axis=1) != 1 for group in groups)
+    assert np.allclose(diagonal, expected)
@@ -1,5 +1,7 @@
+import numpy as np
 from qat.core import Observable, Term
-from qiskit.quantum_info import SparsePauliOp
+from qiskit.quantum_info import PauliList, SparsePauliOp
+from scipy.sparse import coo_matrix, csr_matrix, diags, issparse, spmatrix
 from typing import Iterable, Dict, Tuple, Set, List
 
 
@@ -11,25 +13,110 @@ def ham_from_qiskit_to_atos(q_h: SparsePauliOp) -> Observable:
     return line_obs
 
 
-def qubo_to_hamiltonian(qubo: Iterable[Iterable[int]] | Dict[Tuple[str, str], float], offset: float = 0) -> SparsePauliOp:
+def qubo_to_hamiltonian(qubo: Iterable[Iterable[int]] | spmatrix | Dict[Tuple[str, str], float], offset: float = 0) -> SparsePauliOp:
     """
     Convert a QUBO into a quadratic Hamiltonian in the form of a SparsePauliOp.
 
+    Only the upper triangle (with the diagonal) of a QUBO matrix is taken into account.
+
     Args:
-        qubo (Iterable[Iterable[int]] | Dict[Tuple[str, str], float]): Quadratic Unconstrained Binary Optimization written in the form of matrix or dictionary[Tuple[key, key], value].
+        qubo (Iterable[Iterable[int]] | spmatrix | Dict[Tuple[str, str], float]): Quadratic Unconstrained Binary Optimization written in the form of dense or scipy.sparse matrix or dictionary[Tuple[key, key], value].
         offset (float, optional): The offset (constant) value that will be added to identity. Defaults to 0.
 
     Returns:
-        SparsePauliOp: _description_
+        SparsePauliOp: Hamiltonian with Z, ZZ and identity terms.
     """
 
     if isinstance(qubo, dict):
-        return _qubo_dict_into_hamiltonian(qubo, offset)
-    elif isinstance(qubo, Iterable):
-        return _qubo_matrix_into_hamiltonian(qubo, offset)
+        return qubo_dict_to_hamiltonian(qubo, offset)[0]
+    elif issparse(qubo) or isinstance(qubo, Iterable):
+        return _qubo_array_into_hamiltonian(qubo, offset)
     raise ValueError("QUBO must be a matrix or a dictionary")
 
 
+def _qubo_array_into_hamiltonian(qubo: Iterable[Iterable[int]] | spmatrix, offset: float = 0) -> SparsePauliOp:
+    """ Vectorized counterpart of `_qubo_matrix_into_hamiltonian` for dense and scipy.sparse matrices """
+    if issparse(qubo):
+        coo = qubo.tocoo()
+        rows, cols, values = coo.row, coo.col, coo.data
+    else:
+        qubo = np.asarray(qubo)
+        rows, cols = np.nonzero(qubo)
+        values = qubo[rows, cols]
+    assert qubo.ndim == 2 and qubo.shape[0] == qubo.shape[1], "QUBO matrix must be square"
+
+    upper = rows <= cols
+    return _qubo_coo_into_hamiltonian(qubo.shape[0], rows[upper], cols[upper], values[upper], offset)
+
+
+def _qubo_coo_into_hamiltonian(num_vars: int, rows: Iterable[int], cols: Iterable[int], values: Iterable[float],
+                               offset: float = 0) -> SparsePauliOp:
+    """
+    Convert QUBO given in coordinate form into a Hamiltonian.
+
+    Entries with `row == col` are linear terms, all other entries are couplings between two variables.
+    Repeated coordinates (also in swapped order) are summed up.
+
+    Args:
+        num_vars (int): Number of binary variables (qubits).
+        rows (Iterable[int]): First variable index of every entry.
+        cols (Iterable[int]): Second variable index of every entry.
+        values (Iterable[float]): Value of every entry.
+        offset (float, optional): The offset (constant) value. Defaults to 0.
+
+    Returns:
+        SparsePauliOp: Hamiltonian with Z, ZZ and identity terms.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+
+    diagonal = rows == cols
+    linear = np.bincount(rows[diagonal], weights=values[diagonal], minlength=num_vars)
+
+    first = np.minimum(rows[~diagonal], cols[~diagonal])
+    second = np.maximum(rows[~diagonal], cols[~diagonal])
+    pairs, inverse = np.unique(first * num_vars + second, return_inverse=True)
+    quadratic = np.bincount(inverse.ravel(), weights=values[~diagonal], minlength=len(pairs))
+    pairs, quadratic = pairs[quadratic != 0], quadratic[quadratic != 0]
+    first, second = np.divmod(pairs, num_vars)
+
+    z_linear = -linear / 2 - (np.bincount(first, weights=quadratic, minlength=num_vars)
+                              + np.bincount(second, weights=quadratic, minlength=num_vars)) / 4
+    constant = offset + linear.sum() / 2 + quadratic.sum() / 4
+    return _ising_into_hamiltonian(num_vars, z_linear, first, second, quadratic / 4, constant)
+
+
+def _ising_into_hamiltonian(num_qubits: int, linear: np.ndarray, first: np.ndarray, second: np.ndarray,
+                            couplings: np.ndarray, constant: float = 0) -> SparsePauliOp:
+    """
+    Build SparsePauliOp with Z, ZZ and identity terms in a single call.
+
+    Args:
+        num_qubits (int): Number of qubits.
+        linear (np.ndarray): Coefficients of Z terms, one per qubit.
+        first (np.ndarray): First qubit of every ZZ term.
+        second (np.ndarray): Second qubit of every ZZ term, must differ from `first`.
+        couplings (np.ndarray): Coefficients of ZZ terms.
+        constant (float, optional): Coefficient of identity. Defaults to 0.
+
+    Returns:
+        SparsePauliOp: Hamiltonian without zero and duplicated terms.
+    """
+    linear_qubits = np.flatnonzero(linear)
+    with_constant = constant != 0 or len(linear_qubits) + len(first) == 0
+    num_terms = len(linear_qubits) + len(first) + int(with_constant)
+
+    z = np.zeros((num_terms, num_qubits), dtype=bool)
+    z[np.arange(len(linear_qubits)), linear_qubits] = True
+    quadratic_terms = np.arange(len(linear_qubits), len(linear_qubits) + len(first))
+    z[quadratic_terms, first] = True
+    z[quadratic_terms, second] = True
+
+    coeffs = np.concatenate([linear[linear_qubits], couplings, [constant] if with_constant else []])
+    return SparsePauliOp(PauliList.from_symplectic(z, np.zeros_like(z)), coeffs.astype(complex))
+
+
 def _qubo_matrix_into_hamiltonian(qubo: Iterable[Iterable[int]], offset: float = 0) -> SparsePauliOp:
     N = len(qubo)
     assert all(len(row) == N for row in qubo), "QUBO matrix must be square"
@@ -51,6 +138,35 @@ def _qubo_matrix_into_hamiltonian(qubo: Iterable[Iterable[int]], offset: float =
     return hamiltonian.simplify()
 
 
+def qubo_dict_to_hamiltonian(qubo: Dict[Tuple[str, str], float],
+                             offset: float = 0) -> Tuple[SparsePauliOp, Dict[str, int], Dict[int, str]]:
+    """
+    Convert a QUBO dictionary into a Hamiltonian together with the label <-> qubit index mapping.
+
+    Labels are interned into contiguous integer ids in a single pass, only the distinct labels are sorted
+    and the coefficients are accumulated in arrays, so the cost does not depend on hashing the labels over and over.
+    Qubits are assigned to labels in sorted order, as in `_qubo_dict_into_hamiltonian`.
+
+    Args:
+        qubo (Dict[Tuple[str, str], float]): Quadratic Unconstrained Binary Optimization written in the form of dictionary[Tuple[key, key], value].
+        offset (float, optional): The offset (constant) value that will be added to identity. Defaults to 0.
+
+    Returns:
+        Tuple[SparsePauliOp, Dict[str, int], Dict[int, str]]: Hamiltonian, qubit index by label and label by qubit index.
+    """
+    ids: Dict[str, int] = {}
+    interned = np.fromiter((ids.setdefault(label, len(ids)) for key in qubo for label in key),
+                           dtype=np.int64, count=2 * len(qubo))
+    labels = sorted(ids)
+    rank = np.empty(len(labels), dtype=np.int64)
+    rank[[ids[label] for label in labels]] = np.arange(len(labels))
+    interned = rank[interned]
+
+    values = np.fromiter(qubo.values(), dtype=float, count=len(qubo))
+    hamiltonian = _qubo_coo_into_hamiltonian(len(labels), interned[0::2], interned[1::2], values, offset)
+    return hamiltonian, {label: i for i, label in enumerate(labels)}, dict(enumerate(labels))
+
+
 def _qubo_dict_into_hamiltonian(qubo: Dict[Tuple[str, str], float], offset: float = 0) -> SparsePauliOp:
     label_set: Set[str] = set()
     for (arg1, arg2) in sorted(qubo.keys()):
@@ -79,3 +195,232 @@ def _qubo_dict_into_hamiltonian(qubo: Dict[Tuple[str, str], float], offset: floa
     hamiltonian += SparsePauliOp.from_sparse_list([('I', [0], constant)], N)
 
     return hamiltonian.simplify()
+
+
+def exact_onehot_hamiltonian(groups: Iterable[Iterable[int]], num_qubits: int) -> SparsePauliOp:
+    """
+    Sum over groups of qubits of the penalty 1 - [exactly one qubit of the group is in |1>], assembled once.
+
+    With x_i = (1 - Z_i) / 2 the indicator of exactly one of k qubits is 2^-k sum over subsets T of the group
+    of (k - 2|T|) Z_T, so every term of the penalty is given by the subset mask. Groups of the same size are
+    expanded together into coefficient arrays and all terms are simplified in a single call.
+
+    Args:
+        groups (Iterable[Iterable[int]]): Qubit indices of every onehot constraint.
+        num_qubits (int): Number of qubits.
+
+    Returns:
+        SparsePauliOp: Hamiltonian with I and Z terms, zero exactly when every group has a single qubit in |1>.
+    """
+    by_size: Dict[int, List[np.ndarray]] = {}
+    for group in groups:
+        group = np.asarray(group, dtype=np.int64)
+        by_size.setdefault(len(group), []).append(group)
+
+    z_blocks, coeff_blocks = [np.zeros((1, num_qubits), dtype=bool)], [np.zeros(1)]
+    for size, members in by_size.items():
+        members = np.stack(members)
+        subsets = (np.arange(1 << size)[:, None] >> np.arange(size)) & 1
+        coeffs = -(size - 2 * subsets.sum(axis=1)) / 2 ** size
+        coeffs[0] += 1
+        z = np.zeros((len(members), 1 << size, num_qubits), dtype=bool)
+        z[np.arange(len(members))[:, None, None], np.arange(1 << size)[None, :, None],
+          members[:, None, :]] = subsets.astype(bool)[None]
+        z_blocks.append(z.reshape(-1, num_qubits))
+        coeff_blocks.append(np.tile(coeffs, len(members)))
+    z = np.concatenate(z_blocks)
+    hamiltonian = SparsePauliOp(PauliList.from_symplectic(z, np.zeros_like(z)),
+                                np.concatenate(coeff_blocks).astype(complex))
+    return hamiltonian.simplify()
+
+
+def walsh_hadamard_transform(values: np.ndarray) -> np.ndarray:
+    """
+    Applies the unnormalized fast Walsh-Hadamard transform in place.
+
+    Args:
+        values (np.ndarray): Array of length 2 ** n.
+
+    Returns:
+        np.ndarray: The transformed array, the same object as values.
+    """
+    size = len(values)
+    if size & (size - 1):
+        raise ValueError(f'Length of the array must be a power of 2, got {size}')
+    buffer = np.empty(size // 2, dtype=values.dtype)
+    stride = 1
+    while stride < size:
+        pairs = values.reshape(-1, 2, stride)
+        low, high = pairs[:, 0, :], pairs[:, 1, :]
+        half = buffer.reshape(low.shape)
+        np.subtract(low, high, out=half)
+        low += high
+        high[...] = half
+        stride *= 2
+    return values
+
+
+def hamiltonian_diagonal(hamiltonian: SparsePauliOp) -> np.ndarray:
+    """
+    Returns energies of all computational basis states of a Hamiltonian diagonal in Z.
+
+    The energy of state k is sum_m c_m * (-1) ** popcount(k & m) over terms with Z mask m, so the whole
+    diagonal is a Walsh-Hadamard transform of the coefficients placed at their masks.
+    Bit j of k is the state of qubit j, as in Qiskit.
+
+    Args:
+        hamiltonian (SparsePauliOp): Hamiltonian with only I and Z terms.
+
+    Returns:
+        np.ndarray: Real energies of length 2 ** num_qubits.
+    """
+    if hamiltonian.paulis.x.any():
+        raise ValueError('Hamiltonian is not diagonal, it contains X or Y terms')
+    num_qubits = hamiltonian.num_qubits
+    masks = hamiltonian.paulis.z.astype(np.int64) @ (1 << np.arange(num_qubits, dtype=np.int64))
+    coeffs = np.real(hamiltonian.coeffs * (-1j) ** hamiltonian.paulis.phase)
+    diagonal = np.bincount(masks, weights=coeffs, minlength=1 << num_qubits).astype(float)
+    return walsh_hadamard_transform(diagonal)
+
+
+def hamiltonian_to_qubo(hamiltonian: SparsePauliOp, sparse: bool = False) -> Tuple[np.ndarray | csr_matrix, float]:
+    """
+    Convert a Hamiltonian with Z, ZZ and identity terms into a QUBO, the inverse of `qubo_to_hamiltonian`.
+
+    Qubit i is the binary variable x_i with Z_i = 1 - 2 x_i. Linear coefficients are on the diagonal
+    of the upper triangular QUBO matrix, so x^T Q x + offset is the energy of the state x.
+
+    Args:
+        hamiltonian (SparsePauliOp): Hamiltonian diagonal in Z with at most 2-local terms.
+        sparse (bool, optional): If True, the matrix is returned as scipy.sparse csr_matrix. Defaults to False.
+
+    Returns:
+        Tuple[np.ndarray | csr_matrix, float]: QUBO matrix and offset.
+    """
+    linear, quadratic, constant, higher = _hamiltonian_into_qubo_terms(hamiltonian)
+    if higher.size:
+        raise ValueError('Hamiltonian contains terms on more than two qubits, it has no QUBO form')
+    qubo = (quadratic + diags(linear, format='csr')).tocsr()
+    return (qubo if sparse else qubo.toarray()), constant
+
+
+def _hamiltonian_into_qubo_terms(hamiltonian: SparsePauliOp) -> Tuple[np.ndarray, csr_matrix, float, SparsePauliOp]:
+    """
+    Split a Hamiltonian diagonal in Z into linear and upper triangular quadratic QUBO coefficients and a constant,
+    terms on more than two qubits are returned as they are.
+    """
+    if hamiltonian.paulis.x.any():
+        raise ValueError('Hamiltonian is not diagonal, it contains X or Y terms')
+    n = hamiltonian.num_qubits
+    z = hamiltonian.paulis.z
+    coeffs = np.real(hamiltonian.coeffs * (-1j) ** hamiltonian.paulis.phase)
+    order = z.sum(axis=1)
+
+    # z_i = 1 - 2 x_i
+    constant = float(coeffs[order <= 2].sum())
+    linear = np.zeros(n)
+    single = order == 1
+    np.add.at(linear, z[single].argmax(axis=1), -2 * coeffs[single])
+    pair = order == 2
+    first, second = np.nonzero(z[pair])[1].reshape(-1, 2).T
+    np.add.at(linear, first, -2 * coeffs[pair])
+    np.add.at(linear, second, -2 * coeffs[pair])
+    quadratic = coo_matrix((4 * coeffs[pair], (first, second)), shape=(n, n)).tocsr()
+
+    higher = order > 2
+    higher_terms = SparsePauliOp(PauliList.from_symplectic(z[higher], np.zeros_like(z[higher])), coeffs[higher])
+    return linear, quadratic, constant, higher_terms
+
+
+def bitstrings_to_array(bitstrings: Iterable[str], qubit_order: bool = True) -> np.ndarray:
+    """
+    Converts equally long bitstrings into a 2D uint8 array of 0s and 1s, without a Python loop over characters.
+
+    Args:
+        bitstrings (Iterable[str]): Bitstrings, e.g. keys of counts.
+        qubit_order (bool, optional): If True, column j is qubit j, i.e. the strings are read from the right
+            as in Qiskit. Otherwise columns are in the order of characters. Defaults to True.
+
+    Returns:
+        np.ndarray: Array of shape (number of bitstrings, length of bitstrings).
+    """
+    bitstrings = list(bitstrings)
+    if not bitstrings:
+        return np.zeros((0, 0), dtype=np.uint8)
+    chars = np.frombuffer(''.join(bitstrings).encode('ascii'), dtype=np.uint8).reshape(len(bitstrings), -1)
+    bits = chars - np.uint8(ord('0'))
+    return bits[:, ::-1] if qubit_order else bits
+
+
+class EnergyEvaluator:
+    """
+    Evaluates energies of batches of computational basis states of a Hamiltonian diagonal in Z.
+
+    Terms acting on at most two qubits are rewritten once into the QUBO form x^T Q x + l^T x + c with sparse Q,
+    so a batch of states is evaluated with a single sparse matrix product. Terms on more qubits (e.g. exact onehot
+    constraints) are evaluated as parities of one integer matrix product with their Z masks.
+    For up to `MAX_DIAGONAL_QUBITS` qubits the full diagonal can be cached, then integer states are just looked up.
+    Bit j of a state is qubit j, as in Qiskit.
+
+    Attributes:
+        num_qubits (int): Number of qubits.
+        constant (float): Constant of the QUBO form.
+        linear (np.ndarray): Linear coefficients of the QUBO form.
+        quadratic (scipy.sparse.csr_matrix): Upper triangular quadratic coefficients of the QUBO form.
+        cache_diagonal (bool): Whether to compute the full diagonal and use it for integer states.
+
+    Example of usage:
+        evaluator = EnergyEvaluator(problem.get_qiskit_hamiltonian())
+        energies = evaluator.evaluate_bitstrings(counts.keys())
+    """
+    MAX_DIAGONAL_QUBITS = 26
+
+    def __init__(self, hamiltonian: SparsePauliOp, cache_diagonal: bool = False) -> None:
+        self.hamiltonian = hamiltonian
+        self.num_qubits = n = hamiltonian.num_qubits
+        self.cache_diagonal = cache_diagonal and n <= self.MAX_DIAGONAL_QUBITS
+        self._diagonal = None
+
+        self.linear, self.quadratic, self.constant, higher = _hamiltonian_into_qubo_terms(hamiltonian)
+        self._masks = higher.paulis.z.T.astype(np.int32)
+        self._coeffs = np.real(higher.coeffs)
+
+    @property
+    def diagonal(self) -> np.ndarray:
+        """ Energies of all 2 ** num_qubits states, computed once """
+        if self.num_qubits > self.MAX_DIAGONAL_QUBITS:
+            raise ValueError(f'Diagonal of {self.num_qubits} qubits is too large to be cached')
+        if self._diagonal is None:
+            self._diagonal = hamiltonian_diagonal(self.hamiltonian)
+        return self._diagonal
+
+    def evaluate_bits(self, bits: np.ndarray) -> np.ndarray:
+        """ Returns energies of states given as an array of shape (batch, num_qubits) of 0s and 1s """
+        bits = np.asarray(bits, dtype=np.uint8).reshape(-1, self.num_qubits)
+        x = bits.astype(float)
+        energies = self.constant + x @ self.linear + np.einsum('ij,ij->i', np.asarray(x @ self.quadratic), x)
+        if len(self._coeffs):
+            parities = (bits.astype(np.int32) @ self._masks) & 1
+            energies += (1 - 2 * parities) @ self._coeffs
+        return energies
+
+    def evaluate_packed(self, packed: np.ndarray, bitorder: str = 'little') -> np.ndarray:
+        """ Returns energies of states packed into uint8 rows, as made by np.packbits(bits, axis=1, bitorder) """
+        return self.evaluate_bits(np.unpackbits(np.asarray(packed, dtype=np.uint8).reshape(len(packed), -1),
+                                                axis=1, count=self.num_qubits, bitorder=bitorder))
+
+    def evaluate_integers(self, states: Iterable[int]) -> np.ndarray:
+        """ Returns energies of states given as integers, bit j being qubit j """
+        if self.cache_diagonal:
+            return self.diagonal[np.asarray(states, dtype=np.int64)]
+        if self.num_qubits <= 64:
+            states = np.asarray(states, dtype=np.uint64)
+            shifts = np.arange(self.num_qubits, dtype=np.uint64)
+            return self.evaluate_bits((states[:, None] >> shifts) & np.uint64(1))
+        length = (self.num_qubits + 7) // 8
+        packed = np.frombuffer(b''.join(int(state).to_bytes(length, 'little') for state in states), dtype=np.uint8)
+        return self.evaluate_packed(packed.reshape(-1, length))
+
+    def evaluate_bitstrings(self, bitstrings: Iterable[str]) -> np.ndarray:
+        """ Returns energies of states given as Qiskit bitstrings (qubit 0 is the rightmost character) """
+        return self.evaluate_bits(bitstrings_to_array(bitstrings))